@@ -1,10 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
 from user_interface import UserInterface
-from data import Data
-from model import PredictionModel
-import tkinter as tk
+from model import LEGACY_MODEL_FILENAME, MODEL_FILENAME, PredictionModel
+from model_registry import ModelRegistry
+from progress import ProgressChannel, TrainingCancelled
 from tkinter import messagebox
 import os
 
+# How often the GUI checks whether the background model load has finished (milliseconds)
+MODEL_POLL_MS = 50
+# How often the GUI checks training progress (milliseconds, ~60 fps)
+PROGRESS_POLL_MS = 16
+# How often the GUI checks whether the active model file was replaced, e.g. by a rollback (milliseconds)
+MODEL_WATCH_MS = 1000
+
 
 class App:
     """
@@ -13,57 +21,229 @@ class App:
 
     def __init__(self):
         """
-        Initializes the application by loading an existing model (if available)
-        and setting up the user interface.
+        Initializes the application: the user interface is shown right away and
+        an existing model (if available) is loaded on a background thread.
+        """
+        self.model = None
+        self.progress = None  # ProgressChannel of the running training job
+        self.training_future = None
+        self.trainer = ThreadPoolExecutor(max_workers=1)  # Scraping and training run off the GUI thread
+        self.model_mtime = None  # Modification time of the model file the current model was loaded from
+        self.user_interface = UserInterface(self.model, self.start_training, self.cancel_training,
+                                            self.rollback_model)
+
+        # Load existing model without blocking the window; Confirm is enabled once it is ready
+        self.user_interface.set_status("Loading model...")
+        self.loader = ThreadPoolExecutor(max_workers=1)
+        self.model_future = self.loader.submit(self.load_existing_model)
+        self.user_interface.after(MODEL_POLL_MS, self.check_model_loaded)
+        self.user_interface.after(MODEL_WATCH_MS, self.watch_model_file)
+
+    @staticmethod
+    def active_model_mtime():
+        try:
+            return os.stat(MODEL_FILENAME).st_mtime_ns
+        except OSError:
+            return None
+
+    def swap_model(self, model, status):
+        """
+        Hot-swaps a model into the GUI without a restart.
         """
-        self.model = self.load_existing_model()  # Load existing model or prompt retraining
-        self.user_interface = UserInterface(self.model, self.train_model)  # Initialize the GUI
+        self.model = model
+        self.model_mtime = self.active_model_mtime()
+        self.user_interface.update_model(model)
+        self.user_interface.set_status(status)
+
+    def watch_model_file(self):
+        """
+        Reloads the model when the active model file is replaced outside of this window
+        (a rollback or training from the command line) while no training job is running.
+        """
+        mtime = self.active_model_mtime()
+        training = self.training_future is not None and not self.training_future.done()
+        if mtime is not None and self.model_mtime is not None and mtime != self.model_mtime and not training:
+            model = PredictionModel(load_existing=True)
+            if model.is_trained():
+                self.swap_model(model, "Model reloaded")
+            else:
+                self.model_mtime = mtime  # Keep the current model; do not retry the same file
+        self.user_interface.after(MODEL_WATCH_MS, self.watch_model_file)
+
+    def rollback_model(self):
+        """
+        Re-activates the previous model from the registry and swaps it in.
+        """
+        if self.training_future is not None and not self.training_future.done():
+            return
+        key = ModelRegistry().rollback()
+        if key is None:
+            messagebox.showinfo("Rollback", "There is no earlier model to roll back to.")
+            return
+        model = PredictionModel(load_existing=True)
+        if not model.is_trained():
+            messagebox.showerror("Error", "The earlier model could not be loaded.")
+            return
+        self.swap_model(model, f"Rolled back to model {key[:8]}")
 
     def load_existing_model(self):
         """
         Loads an existing trained model from file if available.
-        If the model is missing or corrupted, the user will be prompted to retrain it.
+        Runs on a background thread, so it must not touch the GUI.
+        Returns (model, corrupted): model is None if it is missing or corrupted.
         """
-        if os.path.exists("model.pkl"):
+        if os.path.exists(MODEL_FILENAME) or os.path.exists(LEGACY_MODEL_FILENAME):
             model = PredictionModel(load_existing=True)
 
-            # Ensure the model has valid features before returning it
-            if model.features is not None and not model.features.empty:
-                return model
-            else:
-                print("⚠️ The model is empty or corrupted – retraining is required!")
-                messagebox.showwarning("Error", "Detected issues with the model. Please retrain it.")
-                return None
+            # Ensure the model was loaded and can make predictions before returning it
+            if model.is_trained():
+                return model, False
+            print("⚠️ The model is empty or corrupted – retraining is required!")
+            return None, True
 
         print("⚠️ No existing model found – please train the model first.")
-        return None
+        return None, False
+
+    def check_model_loaded(self):
+        """
+        Polls the background model load from the Tk event loop and hands the model to the GUI.
+        If the model is corrupted, the user will be prompted to retrain it.
+        """
+        if not self.model_future.done():
+            self.user_interface.after(MODEL_POLL_MS, self.check_model_loaded)
+            return
+        self.loader.shutdown(wait=False)
+
+        try:
+            model, corrupted = self.model_future.result()
+        except Exception as e:
+            print(f"❌ Error loading model: {e}")
+            model, corrupted = None, True
+
+        if self.model is not None:
+            return  # A model trained meanwhile takes precedence and has already set the status
+        if model is not None:
+            self.swap_model(model, "Model ready")
+        elif corrupted:
+            self.user_interface.set_status("Model needs retraining")
+            messagebox.showwarning("Error", "Detected issues with the model. Please retrain it.")
+        else:
+            self.user_interface.set_status("No model – train it first")
 
-    def train_model(self):
+    def start_training(self):
         """
-        Retrieves data, trains a new model, and updates the GUI with the new model.
+        Starts scraping and training on a worker thread; the GUI stays responsive
+        and shows progress until the job finishes or is cancelled.
+        """
+        if self.training_future is not None and not self.training_future.done():
+            return
+        self.progress = ProgressChannel()
+        self.training_future = self.trainer.submit(self.train_model, self.progress)
+        self.user_interface.training_started()
+        self.user_interface.after(PROGRESS_POLL_MS, self.check_training)
+
+    def cancel_training(self):
         """
+        Asks the running training job to stop at its next checkpoint.
+        """
+        if self.progress is not None:
+            self.progress.cancel()
+            self.user_interface.set_status("Cancelling...")
+
+    def train_model(self, progress):
+        """
+        Retrieves data and trains a new model. Runs on the training thread, so it must not
+        touch the GUI; it returns the new model or raises on failure or cancellation.
+        """
+        from data import Data  # Scraping and storage dependencies are only needed for training
+        from dataset_store import DatasetStore
+
         print("🔄 Fetching data from the website...")
-        data_instance = Data()  # Create a Data object
-        self.data = data_instance.load_computer_data()  # Load the dataset
+        data_instance = Data(parse_workers=os.cpu_count())  # Parse pages on every core
+        if data_instance.main_page is None:
+            raise ValueError("Failed to retrieve data from the website!")
+        data = data_instance.load_computer_data(progress)  # Load the dataset
 
         # Validate if the dataset is correctly loaded
-        if self.data is None or self.data.empty:
-            messagebox.showerror("Error", "Failed to retrieve data from the website!")
-            return
+        if data is None or data.empty:
+            raise ValueError("Failed to retrieve data from the website!")
+        self.data = data
+
+        # Keep the scraped listings for later training runs
+        progress.check_cancelled()
+        progress.report("store", rows=len(data))
+        store = DatasetStore()
+        new_listings = store.append(data)
+        print(f"💾 Stored {new_listings} new listings in the dataset.")
+        parts = store.parts()
+        columns = list(PredictionModel.CATEGORICAL_MAPPINGS.keys()) + ["price"]
 
-        print("✅ Data successfully retrieved! Starting model training...")
-        self.model = PredictionModel(self.data, load_existing=False)  # Train a new model
+        # The registry records which part files the active model covers, so listings stored while an
+        # older model was active (after a rollback, or a failed or cancelled run) are still folded in
+        registry = ModelRegistry()
+        entry = registry.active_entry()
+        covered = entry.get("store_parts") if entry is not None else None
+        statistics = self.model.statistics if self.model is not None else None
+        if (statistics is not None and covered is not None and set(covered) <= set(parts)
+                and self.model_mtime == self.active_model_mtime()):
+            uncovered = [part for part in parts if part not in set(covered)]
+            if not uncovered:
+                print("✅ No new listings since the last training run.")
+                return self.model
+            fresh = store.read(columns=columns, parts=uncovered)
+            print(f"✅ Data successfully retrieved! Updating the model with {len(fresh)} new listings...")
+            model = PredictionModel(fresh, progress=progress, base_statistics=statistics,
+                                    base_index=self.model.get_listing_index(), registry=registry)
+        else:
+            # Trains a new model on every stored listing, unless the registry holds one trained on exactly this data
+            history = store.read(columns=columns)
+            print(f"✅ Data successfully retrieved! Starting model training on {len(history)} listings...")
+            model = PredictionModel(history, progress=progress, registry=registry)
 
         # Ensure the model was successfully trained
-        if self.model is None or self.model.features is None or self.model.features.empty:
-            messagebox.showerror("Error", "Model training failed! Please check the data.")
+        if not model.is_trained():
+            raise ValueError("Model training failed! Please check the data.")
+        if model.dataset_key is not None:
+            registry.annotate(model.dataset_key, store_parts=parts)
+        return model
+
+    def check_training(self):
+        """
+        Polls the training job from the Tk event loop (about 60 times per second):
+        shows the latest progress and, once finished, swaps in the new model only on success.
+        """
+        messages = self.progress.drain()
+        if messages:
+            self.user_interface.show_progress(messages[-1])
+
+        if not self.training_future.done():
+            self.user_interface.after(PROGRESS_POLL_MS, self.check_training)
+            return
+
+        try:
+            model = self.training_future.result()
+        except TrainingCancelled:
+            print("⚠️ Training cancelled.")
+            self.user_interface.training_finished("Training cancelled")
+            return
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            self.user_interface.training_finished("Training failed")
+            messagebox.showerror("Error", str(e))
             return
 
         # Update the model in the GUI after retraining
-        self.user_interface.update_model(self.model)
+        self.swap_model(model, "Model ready")
+        self.user_interface.training_finished("Model ready")
+        messagebox.showinfo("Success", "The model has been retrained and saved!")
 
     def run(self):
         """
         Starts the main event loop for the GUI.
         """
         self.user_interface.mainloop()  # Start the GUI event loop
+
+        # Window closed: stop a running training job at its next checkpoint
+        if self.progress is not None:
+            self.progress.cancel()
+        self.trainer.shutdown(wait=False, cancel_futures=True)
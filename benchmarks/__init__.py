@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for the Computer Price Prediction pipeline.
+Run them from the repository root, e.g. ``python -m benchmarks.bench_fetch``.
+"""
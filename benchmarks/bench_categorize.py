@@ -0,0 +1,50 @@
+"""
+Row-wise .apply categorization (the original implementation) versus
+PredictionModel.categorize_column on a large synthetic frame of raw listing values.
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import generate_listings_frame
+from model import PredictionModel
+
+
+def legacy_categorize(mapping, value):
+    """
+    The original linear substring scan over the mapping keys.
+    """
+    if isinstance(value, str):
+        for key, category in mapping.items():
+            if key in value:
+                return category
+    return "Other"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    frame = generate_listings_frame(args.rows)
+    model = PredictionModel(load_existing=False)
+
+    start = time.perf_counter()
+    legacy = {column: frame[column].apply(lambda x: legacy_categorize(mapping, x))
+              for column, mapping in PredictionModel.CATEGORICAL_MAPPINGS.items()}
+    legacy_seconds = time.perf_counter() - start
+
+    PredictionModel.categorize_string.cache_clear()
+    start = time.perf_counter()
+    vectorized = {column: model.categorize_column(column, frame[column])
+                  for column in PredictionModel.CATEGORICAL_MAPPINGS}
+    vectorized_seconds = time.perf_counter() - start
+
+    identical = all((legacy[column].to_numpy() == vectorized[column]).all() for column in legacy)
+    print(f"rows={args.rows:,}")
+    print(f".apply + substring scan   {legacy_seconds:8.3f}s")
+    print(f"categorize_column         {vectorized_seconds:8.3f}s  x{legacy_seconds / vectorized_seconds:.1f}  "
+          f"identical: {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Compares sequential and concurrent page fetching in Data.load_computer_data
+against the local fixture server, a cold versus warm run with the HTTP cache,
+and in-process versus multi-process parsing in the streaming pipeline.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fixture_server import load_saved_pages, start_fixture_server
+from benchmarks.synthetic import generate_pages
+from data import Data
+
+
+def time_scrape(url, max_workers, cache_dir=None, parse_workers=1):
+    """
+    Runs a full scrape and returns (seconds, DataFrame).
+    """
+    start = time.perf_counter()
+    frame = Data(url, max_workers=max_workers, cache_dir=cache_dir, parse_workers=parse_workers).load_computer_data()
+    return time.perf_counter() - start, frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages-dir", help="Directory with saved page-<n>.html files (default: synthetic pages)")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--parse-workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    pages = load_saved_pages(args.pages_dir) if args.pages_dir else generate_pages(args.pages)[0]
+    server = start_fixture_server(pages, args.latency)
+    try:
+        reference = None
+        for workers in args.workers:
+            seconds, frame = time_scrape(server.url, workers)
+            if reference is None:
+                reference = frame
+            identical = frame.equals(reference)
+            print(f"workers={workers:>3}  {seconds:7.3f}s  rows={len(frame)}  same rows/order: {identical}")
+
+        # Retrain against an unchanged catalogue: the warm run should only see 304s
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for label in ("cold cache", "warm cache"):
+                server.status_counts.clear()
+                seconds, frame = time_scrape(server.url, max(args.workers), cache_dir)
+                print(f"{label}  {seconds:7.3f}s  rows={len(frame)}  same rows/order: {frame.equals(reference)}  "
+                      f"responses: {dict(sorted(server.status_counts.items()))}")
+
+        # Parsing is the bottleneck without network latency: spread it over processes
+        server.latency = 0
+        for parse_workers in args.parse_workers:
+            seconds, frame = time_scrape(server.url, max(args.workers), parse_workers=parse_workers)
+            print(f"parse workers={parse_workers:>3}  {seconds:7.3f}s  rows={len(frame)}  "
+                  f"same rows/order: {frame.equals(reference)}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-page parse time of the original per-field find/find_next extraction versus
+the single-pass listing parser, on saved or synthetic listing pages.
+"""
+import argparse
+import time
+
+import bs4
+import numpy as np
+
+from benchmarks.fixture_server import load_saved_pages
+from benchmarks.synthetic import generate_pages
+from listing_parser import parse_listing_page
+
+
+def _field(block, label_match, clean):
+    label = block.find('td', class_='kp-tabela-tdleft', string=label_match)
+    if label and label.find_next('td', class_='kp-tabela-tdright'):
+        return clean(label.find_next('td', class_='kp-tabela-tdright').text)
+    return np.nan
+
+
+def legacy_parse_page(content):
+    """
+    The original extraction from Data.load_computer_data: seven find() scans per block,
+    two find_next() calls per hit and a find_previous() for the price, on html.parser.
+    """
+    soup = bs4.BeautifulSoup(content, 'html.parser')
+    rows = []
+    for block in soup.find_all('div', class_='decriptions-short'):
+        processor = _field(block, lambda s: 'Model procesora:' in s or 'Procesor:' in s,
+                           lambda t: t.strip().replace("\xa0", ""))
+        disk = _field(block, lambda s: 'Dysk:' in s or 'Pojemność dysku:' in s,
+                      lambda t: t.strip().replace("\xa0", ""))
+        ram = _field(block, lambda s: 'Pamięć: RAM:' in s or 'Ilość pamięci RAM:' in s, lambda t: t.strip())
+        os = _field(block, 'System operacyjny:',
+                    lambda t: t.strip().replace("\xa0", "").replace("Windows 11 Pro", "Windows 11Pro"))
+        condition = _field(block, 'Stan:', lambda t: t.strip())
+        graphic_card = _field(block, 'Karta graficzna:', lambda t: t.strip().replace("\xa0", ""))
+
+        price = np.nan
+        price_div = block.find_previous('div', class_='product-price-and-shipping hidden-md-up')
+        if price_div:
+            price_span = price_div.find('span', class_='price')
+            if price_span:
+                price = float(price_span.text.replace(" ", "").replace(",", ".").replace("zł", "").replace("\xa0", ""))
+        rows.append((processor, disk, ram, os, condition, graphic_card, price))
+    return rows
+
+
+def time_per_page(parse, pages, repeat):
+    """
+    Returns the best-of-repeat average parse time per page in milliseconds, and the parsed rows.
+    """
+    best, rows = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = [parse(content) for content in pages]
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages) * 1000, rows
+
+
+def same_rows(left, right):
+    """
+    Compares parsed pages treating NaN as equal to NaN.
+    """
+    def normalize(pages):
+        return [[tuple(None if isinstance(v, float) and np.isnan(v) else v for v in row) for row in page]
+                for page in pages]
+    return normalize(left) == normalize(right)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages-dir", help="Directory with saved page-<n>.html files (default: synthetic pages)")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_saved_pages(args.pages_dir) if args.pages_dir else generate_pages(args.pages)[0]
+    contents = [pages[number] for number in sorted(pages)]
+
+    legacy_ms, legacy_rows = time_per_page(legacy_parse_page, contents, args.repeat)
+    print(f"legacy find/find_next (html.parser)  {legacy_ms:8.2f} ms/page")
+    for backend in ("html.parser", "lxml"):
+        try:
+            ms, rows = time_per_page(lambda content: parse_listing_page(content, backend), contents, args.repeat)
+        except bs4.FeatureNotFound:
+            print(f"single-pass ({backend}) skipped: backend not installed")
+            continue
+        print(f"single-pass ({backend}){' ' * (24 - len(backend))}{ms:8.2f} ms/page  "
+              f"x{legacy_ms / ms:.1f}  identical rows: {same_rows(rows, legacy_rows)}")
+
+
+if __name__ == '__main__':
+    main()
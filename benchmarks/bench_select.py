@@ -0,0 +1,69 @@
+"""
+Cross-validated model selection done naively (categorize, encode and fit again for every
+candidate and fold, one after another) versus model_selection.select_model on a design
+matrix encoded once and shared with a process pool.
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import OneHotEncoder
+
+from benchmarks.synthetic import generate_listings_frame
+from model import PredictionModel
+from model_selection import DEFAULT_FOLDS, default_candidates, select_model
+
+
+def categorize(model, frame):
+    return frame.assign(**{column: model.categorize_column(column, frame[column])
+                           for column in PredictionModel.CATEGORICAL_MAPPINGS})
+
+
+def naive_select(model, frame, folds):
+    """
+    Re-runs categorization and encoding inside every (candidate, fold) fit.
+    """
+    scores = {}
+    for name, estimator in default_candidates():
+        errors = []
+        for train_index, test_index in KFold(folds, shuffle=True, random_state=42).split(frame):
+            PredictionModel.categorize_string.cache_clear()
+            train, test = categorize(model, frame.iloc[train_index]), categorize(model, frame.iloc[test_index])
+            encoder = OneHotEncoder(handle_unknown='ignore').fit(train.iloc[:, :-1])
+            fitted = clone(estimator).fit(encoder.transform(train.iloc[:, :-1]), train.iloc[:, -1])
+            residuals = fitted.predict(encoder.transform(test.iloc[:, :-1])) - test.iloc[:, -1].to_numpy()
+            errors.append(np.mean(residuals ** 2))
+        scores[name] = float(np.mean(errors))
+    return min(scores, key=scores.get), scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    frame = generate_listings_frame(args.rows)
+    model = PredictionModel(load_existing=False)
+
+    start = time.perf_counter()
+    naive_winner, _ = naive_select(model, frame, args.folds)
+    naive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    PredictionModel.categorize_string.cache_clear()
+    categorized = categorize(model, frame)
+    X = OneHotEncoder(handle_unknown='ignore').fit_transform(categorized.iloc[:, :-1])
+    winner, _, _ = select_model(X, categorized.iloc[:, -1], folds=args.folds, n_jobs=args.jobs)
+    shared_seconds = time.perf_counter() - start
+
+    print(f"rows={args.rows:,} folds={args.folds} candidates={len(default_candidates())}")
+    print(f"re-encode per fit         {naive_seconds:8.3f}s  winner: {naive_winner}")
+    print(f"encode once + pool        {shared_seconds:8.3f}s  x{naive_seconds / shared_seconds:.1f}  winner: {winner}")
+
+
+if __name__ == '__main__':
+    main()
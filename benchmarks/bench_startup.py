@@ -0,0 +1,91 @@
+"""
+Startup cost of the GUI: import time of each application module, model load time,
+and time to the first drawn window and to an enabled Confirm button.
+Every measurement runs in a fresh interpreter so nothing is cached between them.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+heavy = [name for name in ("pandas", "sklearn", "requests", "bs4", "pyarrow") if name in sys.modules]
+print(json.dumps({{"seconds": time.perf_counter() - start, "heavy": heavy}}))
+"""
+
+MODEL_LOAD_PROBE = """
+import json, time
+import model
+start = time.perf_counter()
+loaded = model.PredictionModel(load_existing=True)
+print(json.dumps({"seconds": time.perf_counter() - start, "trained": loaded.is_trained()}))
+"""
+
+WINDOW_PROBE = """
+import json, time
+start = time.perf_counter()
+from app import App
+imported = time.perf_counter() - start
+app = App()
+app.user_interface.update()
+first_window = time.perf_counter() - start
+while not app.model_future.done():
+    app.user_interface.update()
+    time.sleep(0.001)
+app.user_interface.update()
+time.sleep(0.06)  # Let the next poll hand the model to the GUI
+app.user_interface.update()
+model_ready = time.perf_counter() - start
+app.user_interface.destroy()
+print(json.dumps({"import": imported, "first_window": first_window, "model_ready": model_ready}))
+"""
+
+
+def run_probe(code, cwd):
+    """
+    Runs a probe in a fresh interpreter and returns its JSON output, or the error text.
+    """
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+    return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-dir", default=REPO_ROOT, help="Directory holding model.npz / model.pkl")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for module in ("model", "data", "user_interface", "app"):
+        runs = [run_probe(IMPORT_PROBE.format(module=module), args.model_dir) for _ in range(args.repeat)]
+        errors = [error for _, error in runs if error]
+        if errors:
+            print(f"import {module:<15} skipped: {errors[0]}")
+            continue
+        best = min(runs, key=lambda run: run[0]["seconds"])[0]
+        print(f"import {module:<15} {best['seconds'] * 1000:8.1f} ms  heavy modules: {best['heavy'] or '-'}")
+
+    result, error = run_probe(MODEL_LOAD_PROBE, args.model_dir)
+    if error:
+        print(f"model load            skipped: {error}")
+    else:
+        print(f"model load            {result['seconds'] * 1000:8.1f} ms  trained: {result['trained']}")
+
+    result, error = run_probe(WINDOW_PROBE, args.model_dir)
+    if error:
+        print(f"first window          skipped (needs a display and ttkbootstrap): {error}")
+    else:
+        print(f"first window          {result['first_window'] * 1000:8.1f} ms  (imports {result['import'] * 1000:.1f} ms)")
+        print(f"Confirm enabled       {result['model_ready'] * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
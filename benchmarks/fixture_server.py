@@ -0,0 +1,112 @@
+"""
+Local HTTP server that serves saved or synthetic zikom.pl listing pages with artificial latency.
+"""
+import argparse
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import generate_pages
+
+
+def load_saved_pages(directory):
+    """
+    Loads saved pages named page-<n>.html from a directory.
+    Returns a dict mapping page number -> HTML bytes.
+    """
+    pages = {}
+    for name in os.listdir(directory):
+        if name.startswith("page-") and name.endswith(".html"):
+            with open(os.path.join(directory, name), "rb") as file:
+                pages[int(name[len("page-"):-len(".html")])] = file.read()
+    return pages
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the pages to serve and the simulated latency.
+    """
+    daemon_threads = True
+
+    def __init__(self, pages, latency=0.0, host="127.0.0.1", port=0):
+        super().__init__((host, port), FixtureHandler)
+        self.pages = pages
+        self.latency = latency
+        self.request_count = 0
+        self.status_counts = {}  # HTTP status -> number of responses
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real shop
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def count(self, status):
+        with self.server.lock:
+            self.server.status_counts[status] = self.server.status_counts.get(status, 0) + 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.request_count += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        query = parse_qs(urlparse(self.path).query)
+        page_number = int(query.get("page", ["1"])[0])
+        body = self.server.pages.get(page_number)
+        if body is None:
+            self.count(404)
+            self.send_error(404)
+            return
+
+        # Pages carry an ETag so clients can revalidate with If-None-Match
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.count(304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.count(200)
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+def start_fixture_server(pages, latency=0.0):
+    """
+    Starts a fixture server in a background thread and returns it.
+    Call server.shutdown() when done.
+    """
+    server = FixtureServer(pages, latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve listing pages locally for scraper testing.")
+    parser.add_argument("--pages-dir", help="Directory with saved page-<n>.html files (default: synthetic pages)")
+    parser.add_argument("--pages", type=int, default=20, help="Number of synthetic pages to generate")
+    parser.add_argument("--latency", type=float, default=0.1, help="Artificial latency per request in seconds")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    served_pages = load_saved_pages(args.pages_dir) if args.pages_dir else generate_pages(args.pages)[0]
+    fixture = FixtureServer(served_pages, args.latency, port=args.port)
+    print(f"Serving {len(served_pages)} pages on {fixture.url} (latency {args.latency}s)")
+    fixture.serve_forever()
@@ -0,0 +1,95 @@
+"""
+Load generator for the prediction server: keeps a number of concurrent keep-alive
+connections busy with POST /predict requests for a fixed duration, then reports
+client-side p50/p99 latency and throughput next to the server's own /metrics.
+
+    python main.py serve &
+    python -m benchmarks.load_generator --concurrency 64 --batch 1 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import generate_listings_frame
+from prediction_server import DEFAULT_HOST, DEFAULT_PORT
+
+
+async def request(reader, writer, host, method, path, payload=None):
+    """
+    Sends one HTTP/1.1 request on an open connection and returns (status, decoded JSON).
+    """
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    length = next(int(line.split(":", 1)[1]) for line in header_lines if line.lower().startswith("content-length"))
+    return int(status_line.split(" ")[1]), json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, payloads, stop_at, latencies, failures):
+    """
+    One connection sending requests back to back until the deadline.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        i = 0
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, "POST", "/predict", payloads[i % len(payloads)])
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                failures.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    # The server only accepts string values: missing fields are sent as an unknown category
+    frame = generate_listings_frame(max(args.batch * 64, 1000)).iloc[:, :-1].fillna("Other")
+    configurations = frame.to_dict(orient="records")
+    if args.batch == 1:
+        payloads = configurations
+    else:
+        payloads = [{"configurations": configurations[i:i + args.batch]}
+                    for i in range(0, len(configurations) - args.batch + 1, args.batch)]
+
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args.host, args.port, payloads, start + args.duration, latencies, failures)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, server_metrics = await request(reader, writer, args.host, "GET", "/metrics")
+    writer.close()
+
+    latencies_ms = np.array(latencies) * 1000
+    p50, p99 = np.percentile(latencies_ms, [50, 99]) if len(latencies_ms) else (float("nan"), float("nan"))
+    print(f"concurrency={args.concurrency} batch={args.batch} duration={elapsed:.1f}s")
+    print(f"requests   {len(latencies):10,}  ({len(latencies) / elapsed:,.0f}/s)  failed: {len(failures)}")
+    print(f"rows       {len(latencies) * args.batch:10,}  ({len(latencies) * args.batch / elapsed:,.0f}/s)")
+    print(f"latency    p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+    print(f"server     p50 {server_metrics['latency_p50_ms'] or 0:.2f} ms  "
+          f"p99 {server_metrics['latency_p99_ms'] or 0:.2f} ms  "
+          f"rows/batch {server_metrics['rows_per_batch'] or 0:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent connections")
+    parser.add_argument("--batch", type=int, default=1, help="Configurations per request")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
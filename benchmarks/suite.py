@@ -0,0 +1,224 @@
+"""
+Benchmark suite for the hot paths: scraping (against the local fixture server), page parsing,
+categorization, training, model loading, prediction and comparable-listing lookups, on synthetic data from 1k to 10M rows.
+
+Reports repeatable timings (best and median of several runs) and peak traced memory,
+optionally compares them with a stored baseline. Runs fully offline.
+
+    python -m benchmarks.suite --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.fixture_server import start_fixture_server
+from benchmarks.synthetic import LISTINGS_PER_PAGE, generate_listings_frame, generate_pages
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SINGLE_PREDICTIONS = 1_000  # Calls timed by the predict_single and similar cases
+
+
+def quiet():
+    """
+    Silences the emoji progress prints of the code under test.
+    """
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def train_model(frame):
+    from model import PredictionModel
+    with quiet():
+        return PredictionModel(frame.copy(), load_existing=False)
+
+
+def case_scrape(size):
+    from data import Data
+    pages, _ = generate_pages(math.ceil(size / LISTINGS_PER_PAGE))
+    server = start_fixture_server(pages)
+    return (lambda: Data(server.url, cache_dir=None).load_computer_data()), server.shutdown
+
+
+def case_parse(size):
+    from listing_parser import parse_listing_page
+    pages, _ = generate_pages(math.ceil(size / LISTINGS_PER_PAGE))
+    return lambda: [parse_listing_page(content) for content in pages.values()]
+
+
+def case_categorize(size):
+    from model import PredictionModel
+    frame = generate_listings_frame(size)
+    model = PredictionModel.__new__(PredictionModel)
+
+    def run():
+        PredictionModel.categorize_string.cache_clear()
+        return [model.categorize_column(column, frame[column]) for column in PredictionModel.CATEGORICAL_MAPPINGS]
+    return run
+
+
+def case_train(size):
+    frame = generate_listings_frame(size)
+    return lambda: train_model(frame)
+
+
+def case_load(size):
+    from model import PredictionModel
+    train_model(generate_listings_frame(10_000))
+
+    def run():
+        with quiet():
+            return PredictionModel(load_existing=True)
+    return run
+
+
+def case_predict_single(size):
+    model = train_model(generate_listings_frame(10_000))
+    configuration = generate_listings_frame(1, seed=1).iloc[0, :-1].to_dict()
+    return lambda: [model.predict(configuration) for _ in range(SINGLE_PREDICTIONS)]
+
+
+def case_predict_batch(size):
+    model = train_model(generate_listings_frame(10_000))
+    frame = generate_listings_frame(size, seed=1).drop(columns="price")
+    return lambda: model.predict_frame(frame)
+
+
+def case_similar(size):
+    from listing_index import ListingIndex
+    from pipeline import categorize_frame
+    model = train_model(generate_listings_frame(10_000))
+    listings = categorize_frame(generate_listings_frame(size))
+    model.listing_index = ListingIndex.from_frame(listings[model.feature_columns], listings["price"])
+    configurations = generate_listings_frame(SINGLE_PREDICTIONS, seed=1).drop(columns="price").to_dict("records")
+    model.similar_listings(configurations[0])  # Groups the listings once, like the first GUI click
+    return lambda: [model.similar_listings(configuration) for configuration in configurations]
+
+
+# name -> (setup function, largest size it runs at or None if size-independent, what one unit is)
+CASES = {
+    "scrape": (case_scrape, 24_000, "rows"),
+    "parse": (case_parse, 240_000, "rows"),
+    "categorize": (case_categorize, None, "rows"),
+    "train": (case_train, None, "rows"),
+    "load": (case_load, 0, "loads"),
+    "predict_single": (case_predict_single, 0, "calls"),
+    "predict_batch": (case_predict_batch, None, "rows"),
+    "similar": (case_similar, 1_000_000, "calls"),
+}
+
+
+def measure(run, repeat):
+    """
+    Times run repeat times (without tracing), then once more under tracemalloc for peak memory.
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": min(timings), "median": statistics.median(timings), "peak_mb": peak / 2 ** 20}
+
+
+def run_suite(cases, sizes, repeat):
+    """
+    Runs every case at every applicable size in a temporary working directory
+    (models are saved there) and returns the results keyed by "case@size".
+    """
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for name in cases:
+                setup, max_size, unit = CASES[name]
+                case_sizes = [1] if max_size == 0 else [size for size in sizes if max_size is None or size <= max_size]
+                for size in case_sizes:
+                    prepared = setup(size)
+                    run, cleanup = prepared if isinstance(prepared, tuple) else (prepared, None)
+                    try:
+                        result = measure(run, repeat if size < 1_000_000 else 1)
+                    finally:
+                        if cleanup:
+                            cleanup()
+                    units = SINGLE_PREDICTIONS if name in ("predict_single", "similar") else size
+                    result["per_second"] = units / result["seconds"]
+                    result["unit"] = unit
+                    key = f"{name}@{size}" if max_size != 0 else name
+                    results[key] = result
+                    print(f"{key:<24} {result['seconds'] * 1000:10.2f} ms  (median {result['median'] * 1000:.2f} ms)  "
+                          f"{result['per_second']:14,.0f} {unit}/s  peak {result['peak_mb']:8.1f} MB", flush=True)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints a comparison with a baseline; a case is flagged when it is more than threshold slower.
+    Returns the number of regressions.
+    """
+    regressions = 0
+    print(f"\n{'case':<24} {'baseline':>12} {'current':>12} {'change':>9}  peak MB (base -> now)")
+    for key, result in results.items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            print(f"{key:<24} {'-':>12} {result['seconds'] * 1000:10.2f}ms {'new':>9}")
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, regressions = "  REGRESSION", regressions + 1
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{key:<24} {base['seconds'] * 1000:10.2f}ms {result['seconds'] * 1000:10.2f}ms {ratio - 1:+8.1%}  "
+              f"{base['peak_mb']:.1f} -> {result['peak_mb']:.1f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Row counts to run at (up to 10M)")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with this results file (e.g. benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Store the results as {BASELINE_PATH}")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "cpus": os.cpu_count(), "date": time.strftime("%Y-%m-%d %H:%M:%S")},
+        "results": run_suite(args.cases, sorted(args.sizes), args.repeat),
+    }
+    for path in filter(None, [args.output, BASELINE_PATH if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            regressions = compare(report["results"], json.load(file), args.threshold)
+        raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Synthetic zikom.pl-like listing pages used by the benchmarks and the fixture server.
+"""
+import random
+
+import numpy as np
+import pandas as pd
+
+# Raw field values as they appear on the listing pages
+PROCESSORS = ["Intel Core i3-8100", "Intel Core i5-8500", "Intel Core i5-9500T", "Intel Core i7-8700",
+              "Intel Core i9-9900", "AMD Ryzen 3 PRO 2200G", "AMD Ryzen 5 PRO 3400G", "AMD Ryzen 7 PRO 4750G",
+              "Intel Xeon E-2224G", "Intel Pentium G5400"]
+DISKS = ["256GB SSD", "512GB SSD", "500GB HDD", "1TB HDD", "256GB NVMe", "512GB SSD M.2 NVMe"]
+RAMS = ["8GB DDR4", "16GB DDR4", "32GB DDR4", "64GB DDR4", "4GB DDR3"]
+SYSTEMS = ["Windows 10 Pro", "Windows 11 Pro", "Linux", "Brak"]
+CONDITIONS = ["Bardzo dobry", "Używany", "Nowy", "Uszkodzony"]
+GRAPHIC_CARDS = ["Intel UHD Graphics 630", "NVIDIA GeForce GTX 1650", "NVIDIA GeForce RTX 3060",
+                 "AMD Radeon RX 550", "NVIDIA Quadro P620"]
+
+LISTINGS_PER_PAGE = 24
+
+
+def generate_listing(rng):
+    """
+    Returns one random listing as a dict of raw field values and price.
+    """
+    return {
+        "processor": rng.choice(PROCESSORS),
+        "disk": rng.choice(DISKS),
+        "ram": rng.choice(RAMS),
+        "os": rng.choice(SYSTEMS),
+        "condition": rng.choice(CONDITIONS),
+        "graphic_card": rng.choice(GRAPHIC_CARDS),
+        "price": round(rng.uniform(300, 6000), 2),
+    }
+
+
+def format_price(price):
+    """
+    Formats a price the way the shop does, e.g. 1 299,00 zł (with non-breaking spaces).
+    """
+    whole, fraction = f"{price:.2f}".split(".")
+    groups = []
+    while whole:
+        groups.insert(0, whole[-3:])
+        whole = whole[:-3]
+    return "\xa0".join(groups) + "," + fraction + "\xa0zł"
+
+
+def render_listing(listing):
+    """
+    Renders a single product tile: the price block followed by the specification table.
+    """
+    rows = [("Model procesora:", listing["processor"]), ("Dysk:", listing["disk"]),
+            ("Ilość pamięci RAM:", listing["ram"]), ("System operacyjny:", listing["os"]),
+            ("Stan:", listing["condition"]), ("Karta graficzna:", listing["graphic_card"]),
+            ("Gwarancja:", "12 miesięcy")]
+    table = "".join(f'<tr><td class="kp-tabela-tdleft">{label}</td><td class="kp-tabela-tdright">{value}</td></tr>'
+                    for label, value in rows)
+    return (
+        '<article class="product-miniature">'
+        '<div class="thumbnail-container"><a href="#" class="thumbnail product-thumbnail">'
+        '<img src="/img/p.jpg" alt="Komputer poleasingowy" loading="lazy" width="250" height="250"></a></div>'
+        f'<h2 class="h3 product-title"><a href="#">Komputer {listing["processor"]} {listing["ram"]}</a></h2>'
+        '<div class="product-price-and-shipping hidden-sm-down">'
+        f'<span class="price">{format_price(listing["price"])}</span></div>'
+        '<div class="product-price-and-shipping hidden-md-up">'
+        f'<span class="price">{format_price(listing["price"])}</span></div>'
+        f'<div class="decriptions-short"><table>{table}</table></div>'
+        '</article>'
+    )
+
+
+def render_page(listings, page_number, total_pages):
+    """
+    Renders a full listing page with pagination links (the second-to-last link holds the page count).
+    """
+    pagination = "".join(f'<a class="js-search-link" href="?page={n}">{n}</a>' for n in range(1, total_pages + 1))
+    pagination += f'<a class="js-search-link next" href="?page={min(page_number + 1, total_pages)}">Następna</a>'
+    body = "".join(render_listing(listing) for listing in listings)
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Strona {page_number}</title></head>'
+            f'<body><div class="products">{body}</div><nav class="pagination">{pagination}</nav></body></html>')
+
+
+def generate_pages(total_pages, listings_per_page=LISTINGS_PER_PAGE, seed=0):
+    """
+    Generates total_pages synthetic listing pages.
+    Returns (pages, listings) where pages maps page number -> HTML bytes.
+    """
+    rng = random.Random(seed)
+    pages, listings = {}, []
+    for page_number in range(1, total_pages + 1):
+        page_listings = [generate_listing(rng) for _ in range(listings_per_page)]
+        listings.extend(page_listings)
+        pages[page_number] = render_page(page_listings, page_number, total_pages).encode("utf-8")
+    return pages, listings
+
+
+def generate_listings_frame(rows, seed=0, rare_values=50):
+    """
+    Generates a DataFrame of rows raw listings (same columns as Data.load_computer_data),
+    vectorized so it scales to millions of rows. A few values are missing and each column
+    has rare one-off strings, like real listings. Prices depend on the specification.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {"processor": PROCESSORS, "disk": DISKS, "ram": RAMS, "os": SYSTEMS,
+               "condition": CONDITIONS, "graphic_card": GRAPHIC_CARDS}
+    frame, price = {}, np.full(rows, 800.0)
+    for column, values in columns.items():
+        pool = np.array(values + [np.nan] + [f"{column} model {i}" for i in range(rare_values)], dtype=object)
+        weights = np.r_[np.full(len(values), 20.0), 1.0, np.full(rare_values, 0.02)]
+        codes = rng.choice(len(pool), size=rows, p=weights / weights.sum())
+        frame[column] = pool[codes]
+        price += rng.uniform(0, 600, size=len(pool))[codes]  # Every value shifts the price
+    frame["price"] = np.round(price + rng.normal(0, 150, size=rows), 2)
+    return pd.DataFrame(frame)
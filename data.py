@@ -1,30 +1,108 @@
 import bs4
 import requests
-import numpy as np
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import instrumentation
+from http_cache import CACHE_DIR, HttpCache
+from listing_parser import PARSER_VERSION, choose_backend, parse_listing_page
+
+# Default listing URL and fetch settings
+DEFAULT_URL = "https://zikom.pl/poleasingowe-komputery-stacjonarne/"
+DEFAULT_MAX_WORKERS = 8  # Number of listing pages fetched concurrently
+REQUEST_TIMEOUT = 10  # Seconds per request (connect and read)
+MAX_RETRIES = 3  # Retries for connection errors and 429/5xx responses
+BACKOFF_FACTOR = 0.5  # Sleep between retries: 0.5s, 1s, 2s, ...
 
 
 class Data:
-    def __init__(self):
+    def __init__(self, url=DEFAULT_URL, max_workers=DEFAULT_MAX_WORKERS, timeout=REQUEST_TIMEOUT,
+                 retries=MAX_RETRIES, parser_backend=None, cache_dir=CACHE_DIR, parse_workers=None):
         """
         Initializes the Data object and loads the main webpage.
+
+        :param url: Listing URL to scrape (can point to a local test server).
+        :param max_workers: Maximum number of pages fetched at the same time.
+        :param timeout: Timeout in seconds for every HTTP request.
+        :param retries: Number of retries (with exponential backoff) per request.
+        :param parser_backend: BeautifulSoup backend ('lxml', 'html.parser'); lxml is used when installed.
+        :param cache_dir: Directory of the persistent HTTP response cache, or None to disable caching.
+        :param parse_workers: Number of parser processes (default: parse in this process). More than 1
+                              starts a process pool, so the calling script needs an
+                              if __name__ == "__main__" guard.
         """
-        self.url = "https://zikom.pl/poleasingowe-komputery-stacjonarne/"
+        self.url = url
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.parser_backend = choose_backend(parser_backend)
+        self.parse_workers = parse_workers
+        self.session = self.create_session(retries)
+        self.cache = HttpCache(cache_dir) if cache_dir else None
         self.main_page = self.load_main_page()
 
+    def create_session(self, retries):
+        """
+        Creates a shared HTTP session with keep-alive connection pooling
+        and automatic retries with exponential backoff.
+        """
+        retry = Retry(total=retries, backoff_factor=BACKOFF_FACTOR,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
     def load_main_page(self):
         """
         Loads the main webpage using requests and BeautifulSoup.
         Returns the parsed HTML content or None if an error occurs.
         """
         try:
-            page = requests.get(self.url, timeout=5)
-            page.raise_for_status()
-            return bs4.BeautifulSoup(page.content, 'html.parser')
+            content, _ = self.get(self.url)
+            return bs4.BeautifulSoup(content, self.parser_backend)
         except requests.exceptions.RequestException as e:
             print(f"Error loading the page: {e}")
             return None
 
+    def get(self, url):
+        """
+        Downloads a URL through the shared session. With a cache, the request is a
+        conditional GET and a 304 response is served from the cached body.
+        Returns (content, content_hash); the hash is None when caching is disabled.
+        """
+        with instrumentation.span("fetch", url=url) as fetch:
+            headers = self.cache.conditional_headers(url) if self.cache else {}
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            fetch.set(status=response.status_code, bytes=len(response.content))
+            instrumentation.count("fetch_requests", status=response.status_code)
+            instrumentation.count("fetch_bytes", len(response.content))
+            response.raise_for_status()
+            if self.cache is None:
+                return response.content, None
+
+            if response.status_code == 304:
+                content, digest = self.cache.cached_body(url)
+                if content is not None:
+                    return content, digest
+                # The cached body disappeared in the meantime, fetch it again unconditionally
+                response = self.session.get(url, timeout=self.timeout)
+                fetch.set(status=response.status_code, bytes=len(response.content))
+                instrumentation.count("fetch_requests", status=response.status_code)
+                instrumentation.count("fetch_bytes", len(response.content))
+                response.raise_for_status()
+            return response.content, self.cache.store(url, response)
+
+    def fetch_page(self, page_number):
+        """
+        Downloads a single listing page through the shared session.
+        Returns (content, content_hash), or (None, None) if the request fails.
+        """
+        try:
+            return self.get(self.url + "?page=" + str(page_number))
+        except requests.exceptions.RequestException as e:
+            print(f"Error loading page {page_number}: {e}")
+            return None, None
+
     def get_number_of_pages(self):
         """
         Extracts the number of available pages from the website.
@@ -32,74 +110,40 @@ class Data:
         """
         return int(self.main_page.find_all('a', class_="js-search-link")[-2].text.strip())
 
-    def load_computer_data(self):
+    def parse_page(self, content, digest):
         """
-        Scrapes computer specifications and prices from the website.
-        Returns a Pandas DataFrame containing the extracted data.
+        Extracts the rows of one listing page. Pages whose content hash was seen
+        before reuse their cached rows instead of being parsed again.
         """
-        computer_data = {
-            'processor': [], 'disk': [], 'ram': [], 'os': [],
-            'condition': [], 'graphic_card': [], 'price': []
-        }
-
-        # Loop through all pages of product listings
-        for i in range(1, self.get_number_of_pages() + 1):
-            page = requests.get(self.url + "?page=" + str(i))
-            soup = bs4.BeautifulSoup(page.content, 'html.parser')
-
-            # Extract product information
-            for block in soup.find_all('div', class_='decriptions-short'):
-                # Extract processor details
-                processor = block.find('td', class_='kp-tabela-tdleft', string=lambda s: 'Model procesora:' in s or 'Procesor:' in s)
-                if processor and processor.find_next('td', class_='kp-tabela-tdright'):
-                    computer_data['processor'].append(processor.find_next('td', class_='kp-tabela-tdright').text.strip().replace("\xa0", ""))
-                else:
-                    computer_data['processor'].append(np.nan)
-
-                # Extract disk details
-                disk = block.find('td', class_='kp-tabela-tdleft', string=lambda s: 'Dysk:' in s or 'Pojemność dysku:' in s)
-                if disk and disk.find_next('td', class_='kp-tabela-tdright'):
-                    computer_data['disk'].append(disk.find_next('td', class_='kp-tabela-tdright').text.strip().replace("\xa0", ""))
-                else:
-                    computer_data['disk'].append(np.nan)
+        with instrumentation.span("parse", bytes=len(content)) as parse:
+            if self.cache is None or digest is None:
+                rows = parse_listing_page(content, self.parser_backend)
+                parse.set(rows=len(rows))
+                return rows
 
-                # Extract RAM details
-                ram = block.find('td', class_='kp-tabela-tdleft', string=lambda s: 'Pamięć: RAM:' in s or 'Ilość pamięci RAM:' in s)
-                if ram and ram.find_next('td', class_='kp-tabela-tdright'):
-                    computer_data['ram'].append(ram.find_next('td', class_='kp-tabela-tdright').text.strip())
-                else:
-                    computer_data['ram'].append(np.nan)
+            key = f"{digest}-v{PARSER_VERSION}"
+            rows = self.cache.get_rows(key)
+            parse.set(cached=rows is not None)
+            if rows is None:
+                rows = parse_listing_page(content, self.parser_backend)
+                self.cache.put_rows(key, rows)
+            parse.set(rows=len(rows))
+            return rows
 
-                # Extract OS details
-                os = block.find('td', class_='kp-tabela-tdleft', string='System operacyjny:')
-                if os and os.find_next('td', class_='kp-tabela-tdright'):
-                    computer_data['os'].append(os.find_next('td', class_='kp-tabela-tdright').text.strip().replace("\xa0", "").replace("Windows 11 Pro", "Windows 11Pro"))
-                else:
-                    computer_data['os'].append(np.nan)
-
-                # Extract condition details
-                condition = block.find('td', class_='kp-tabela-tdleft', string='Stan:')
-                if condition and condition.find_next('td', class_='kp-tabela-tdright'):
-                    computer_data['condition'].append(condition.find_next('td', class_='kp-tabela-tdright').text.strip())
-                else:
-                    computer_data['condition'].append(np.nan)
-
-                # Extract graphic card details
-                graphic_card = block.find('td', class_='kp-tabela-tdleft', string='Karta graficzna:')
-                if graphic_card and graphic_card.find_next('td', class_='kp-tabela-tdright'):
-                    computer_data['graphic_card'].append(graphic_card.find_next('td', class_='kp-tabela-tdright').text.strip().replace("\xa0", ""))
-                else:
-                    computer_data['graphic_card'].append(np.nan)
+    def load_computer_data(self, progress=None):
+        """
+        Scrapes computer specifications and prices from the website.
+        Returns a Pandas DataFrame containing the extracted data, with the raw (not normalized) fields.
 
-                # Extract price details
-                price_div = block.find_previous('div', class_='product-price-and-shipping hidden-md-up')
-                if price_div:
-                    price_span = price_div.find('span', class_='price')
-                    if price_span:
-                        computer_data['price'].append(float(price_span.text.replace(" ", "").replace(",", ".").replace("zł", "").replace("\xa0", "")))
-                    else:
-                        computer_data['price'].append(np.nan)
-                else:
-                    computer_data['price'].append(np.nan)
+        :param progress: Optional ProgressChannel; receives a "fetch" message per page and is
+                         checked for cancellation between pages (raises TrainingCancelled).
+        """
+        from pipeline import DataFrameSink, ListingPipeline
 
-        return pd.DataFrame(computer_data)
+        # Pages stream through concurrent fetching and multi-process parsing into one DataFrame,
+        # whose raw fields are kept as categorical codes from here on. They are deliberately not
+        # normalized here: the dataset store keys and deduplicates listings by their raw fields
+        # (normalized ones would merge different offers with the same categories and price), and
+        # stored raw values can be re-categorized when the mappings change (TRAINING_VERSION).
+        # Training normalizes them once per distinct value (categorize_column).
+        return ListingPipeline(self, parse_workers=self.parse_workers, progress=progress).run(DataFrameSink())
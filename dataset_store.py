@@ -0,0 +1,167 @@
+import datetime
+import hashlib
+import os
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs
+import pyarrow.parquet as pq
+from listing_parser import COLUMNS
+
+# Default location of the accumulated listings
+DATASET_DIR = "dataset"
+KEY_COLUMN = "listing_key"  # Stable listing key used for deduplication
+DATE_COLUMN = "scrape_date"  # Hive partition column (scrape_date=YYYY-MM-DD directories)
+
+# Schema of every Parquet part file (the partition column lives in the directory name)
+SCHEMA = pa.schema([(column, pa.string()) for column in COLUMNS[:-1]] +
+                   [(COLUMNS[-1], pa.float64()), (KEY_COLUMN, pa.string())])
+PARTITIONING = ds.partitioning(pa.schema([(DATE_COLUMN, pa.date32())]), flavor="hive")
+
+
+class DatasetStore:
+    """
+    An append-only, date-partitioned Parquet store of scraped listings.
+
+    Listings are deduplicated by a stable key (a hash of their specification and price), so
+    the same offer scraped on many days is stored once. Reads project only the requested
+    columns, push date and other filters down to the Parquet scan, and memory-map the files.
+    """
+
+    def __init__(self, directory=DATASET_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.filesystem = pyarrow.fs.LocalFileSystem(use_mmap=True)
+
+    @staticmethod
+    def listing_keys(frame):
+        """
+        Computes the stable key of every listing from its raw fields and price.
+        """
+        fields = frame[list(COLUMNS)].astype(str).agg("\x1f".join, axis=1)
+        return fields.map(lambda row: hashlib.sha1(row.encode("utf-8")).hexdigest())
+
+    def parts(self):
+        """
+        Returns the part files of the store (paths relative to the store, sorted). Part files
+        are never modified once written, so a list of parts identifies exactly which listings
+        a model was trained on.
+        """
+        parts = []
+        for partition in sorted(os.listdir(self.directory)):
+            if partition.startswith(DATE_COLUMN + "="):
+                parts += [f"{partition}/{name}" for name in sorted(os.listdir(os.path.join(self.directory, partition)))
+                          if name.endswith(".parquet") and not name.startswith(".")]
+        return parts
+
+    def dataset(self, parts=None):
+        """
+        Opens the store (or only the given part files) as a pyarrow dataset,
+        or returns None if it holds no data yet.
+        """
+        schema = SCHEMA.append(pa.field(DATE_COLUMN, pa.date32()))
+        if parts is not None:
+            if not parts:
+                return None
+            return ds.dataset([os.path.join(self.directory, part) for part in parts], schema=schema, format="parquet",
+                              partitioning=PARTITIONING, partition_base_dir=self.directory, filesystem=self.filesystem)
+        if not any(entry.startswith(DATE_COLUMN + "=") for entry in os.listdir(self.directory)):
+            return None
+        return ds.dataset(self.directory, schema=schema, format="parquet", partitioning=PARTITIONING,
+                          filesystem=self.filesystem)
+
+    def stored_keys(self, keys):
+        """
+        Returns which of the given listing keys are already stored. The key column is scanned
+        with a pushed-down is_in filter, so only the matching keys are materialized and memory
+        depends on the number of keys asked about, not on the size of the history.
+        """
+        dataset = self.dataset()
+        if dataset is None or len(keys) == 0:
+            return pa.array([], pa.string())
+        candidates = pa.array(pd.unique(keys), pa.string())
+        table = dataset.to_table(columns=[KEY_COLUMN], filter=ds.field(KEY_COLUMN).isin(candidates))
+        return table.column(KEY_COLUMN).combine_chunks()
+
+    def append(self, frames, scrape_date=None):
+        """
+        Streams listings into a new part file of the scrape_date partition (today by default).
+        Accepts a DataFrame or an iterable of DataFrames (e.g. one per page); every chunk is
+        written as its own row group after dropping listings that are already stored.
+        Returns the number of new listings written.
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        scrape_date = scrape_date or datetime.date.today()
+
+        partition = os.path.join(self.directory, f"{DATE_COLUMN}={scrape_date.isoformat()}")
+        name = f"part-{uuid.uuid4().hex}.parquet"
+        path = os.path.join(partition, name)
+        tmp_path = os.path.join(partition, "." + name)  # Hidden files are skipped by dataset discovery
+
+        seen = []  # Keys written by this call (the new part file is not visible to stored_keys yet)
+        written = 0
+        writer = None
+        try:
+            for frame in frames:
+                if frame is None or frame.empty:
+                    continue
+                frame = frame[list(COLUMNS)].copy()
+                frame[KEY_COLUMN] = self.listing_keys(frame)
+                # Anti-join against the stored and already written keys
+                keys = pa.array(frame[KEY_COLUMN], pa.string())
+                known = pa.chunked_array([self.stored_keys(frame[KEY_COLUMN])] + seen, pa.string())
+                frame = frame[~pc.is_in(keys, value_set=known.combine_chunks()).to_numpy(zero_copy_only=False)]
+                frame = frame.drop_duplicates(KEY_COLUMN)
+                if frame.empty:
+                    continue
+                seen.append(pa.array(frame[KEY_COLUMN], pa.string()))
+
+                if writer is None:
+                    os.makedirs(partition, exist_ok=True)
+                    writer = pq.ParquetWriter(tmp_path, SCHEMA)
+                writer.write_table(pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False))
+                written += len(frame)
+        finally:
+            if writer is not None:
+                writer.close()
+                # Readers only ever see complete part files
+                os.replace(tmp_path, path)
+        return written
+
+    def scanner_filter(self, start=None, end=None, filter=None):
+        """
+        Builds the pushed-down filter for a date range (inclusive) and an optional extra expression.
+        """
+        expression = None
+        for condition in (ds.field(DATE_COLUMN) >= start if start else None,
+                          ds.field(DATE_COLUMN) <= end if end else None,
+                          filter):
+            if condition is not None:
+                expression = condition if expression is None else expression & condition
+        return expression
+
+    def iter_batches(self, columns=COLUMNS, start=None, end=None, filter=None, batch_size=65536):
+        """
+        Yields the stored listings as pyarrow RecordBatches, without materializing the history.
+        """
+        dataset = self.dataset()
+        if dataset is None:
+            return
+        yield from dataset.to_batches(columns=list(columns), filter=self.scanner_filter(start, end, filter),
+                                      batch_size=batch_size)
+
+    def read(self, columns=COLUMNS, start=None, end=None, filter=None, parts=None):
+        """
+        Reads the requested columns of the listings scraped between start and end (inclusive),
+        optionally only from the given part files (see parts()).
+        String columns come back as pandas categoricals (dictionary codes) rather than
+        one Python string object per row.
+        """
+        dataset = self.dataset(parts)
+        if dataset is None:
+            return pd.DataFrame(columns=list(columns))
+        table = dataset.to_table(columns=list(columns), filter=self.scanner_filter(start, end, filter))
+        return table.to_pandas(strings_to_categorical=True)
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Default location and size limit of the on-disk response cache
+CACHE_DIR = os.path.join(".cache", "http")
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+
+class HttpCache:
+    """
+    A persistent HTTP response cache for the scraper.
+
+    Bodies are stored by content hash together with their ETag/Last-Modified validators,
+    so pages can be revalidated with conditional GETs. Rows already extracted from a body
+    are stored next to it and reused while the content hash stays the same.
+    The cache is kept under max_bytes by evicting the least recently used pages.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()  # Pages are fetched from several threads
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "rows"), exist_ok=True)
+        self.index = self.load_index()  # url -> {etag, last_modified, hash, size, accessed}
+
+    @staticmethod
+    def content_hash(content):
+        """
+        Returns the SHA-256 hex digest of a response body.
+        """
+        return hashlib.sha256(content).hexdigest()
+
+    def index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def body_path(self, digest):
+        return os.path.join(self.directory, "bodies", digest)
+
+    def rows_path(self, key):
+        return os.path.join(self.directory, "rows", key + ".json")
+
+    def load_index(self):
+        """
+        Loads the cache index, starting empty if it is missing or unreadable.
+        """
+        try:
+            with open(self.index_path(), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self):
+        """
+        Writes the cache index atomically (write to a temporary file, then rename).
+        """
+        tmp_path = self.index_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.index, file)
+        os.replace(tmp_path, self.index_path())
+
+    def flush(self):
+        """
+        Persists access times recorded since the last write.
+        """
+        with self.lock:
+            self.save_index()
+
+    def conditional_headers(self, url):
+        """
+        Returns If-None-Match/If-Modified-Since headers for a cached URL.
+        """
+        with self.lock:
+            entry = self.index.get(url)
+        if entry is None or not os.path.exists(self.body_path(entry["hash"])):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def cached_body(self, url):
+        """
+        Returns (content, hash) of the cached body for a URL after a 304 response,
+        or (None, None) if it is no longer cached.
+        """
+        with self.lock:
+            entry = self.index.get(url)
+            if entry is None:
+                return None, None
+            entry["accessed"] = time.time()
+        try:
+            with open(self.body_path(entry["hash"]), "rb") as file:
+                return file.read(), entry["hash"]
+        except OSError:
+            return None, None
+
+    def store(self, url, response):
+        """
+        Stores a 200 response body with its validators and returns its content hash.
+        """
+        content = response.content
+        digest = self.content_hash(content)
+        path = self.body_path(digest)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(content)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            self.index[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "hash": digest,
+                "size": len(content),
+                "accessed": time.time(),
+            }
+            self.evict()
+            self.save_index()
+        return digest
+
+    def get_rows(self, key):
+        """
+        Returns rows previously extracted from a body, or None.
+        """
+        try:
+            with open(self.rows_path(key), "r", encoding="utf-8") as file:
+                return [tuple(row) for row in json.load(file)]
+        except (OSError, ValueError):
+            return None
+
+    def put_rows(self, key, rows):
+        """
+        Stores rows extracted from a body (NaN values are kept as JSON NaN).
+        Rows of a body that was evicted meanwhile are not stored.
+        """
+        with self.lock:
+            if not any(key.startswith(entry["hash"]) for entry in self.index.values()):
+                return
+        path = self.rows_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(rows, file)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """
+        Removes least recently used pages until the cache fits in max_bytes.
+        Must be called with the lock held.
+        """
+        total = sum(entry["size"] for entry in self.index.values())
+        for url, entry in sorted(self.index.items(), key=lambda item: item[1]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            del self.index[url]
+            total -= entry["size"]
+
+            # Bodies are shared by hash, only delete files no other URL refers to
+            if all(other["hash"] != entry["hash"] for other in self.index.values()):
+                for name in os.listdir(os.path.join(self.directory, "rows")):
+                    if name.startswith(entry["hash"]):
+                        os.remove(os.path.join(self.directory, "rows", name))
+                try:
+                    os.remove(self.body_path(entry["hash"]))
+                except OSError:
+                    pass
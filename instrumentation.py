@@ -0,0 +1,267 @@
+import atexit
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Environment variables that enable instrumentation without code changes
+ENV_JSONL = "PRICE_METRICS_JSONL"  # Write every span as a JSON line to this file
+ENV_PROMETHEUS = "PRICE_METRICS_PROM"  # Write the aggregated metrics in Prometheus text format at exit
+ENV_PROFILE = "PRICE_PROFILE_STAGES"  # Comma-separated span names to run under cProfile
+ENV_TRACE_MEMORY = "PRICE_TRACE_MEMORY_STAGES"  # Comma-separated span names to record peak memory for
+PROFILE_DIR = "profiles"
+
+
+class NullSpan:
+    """
+    The span handed out while instrumentation is disabled: entering, leaving and setting
+    fields do nothing, so instrumented code pays for one attribute check and a call.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    """
+    Times one stage. Fields set while it runs (bytes, rows, status...) are exported with it;
+    optionally the stage runs under cProfile and/or records its traced memory peak.
+    """
+
+    def __init__(self, recorder, name, labels):
+        self.recorder = recorder
+        self.name = name
+        self.fields = dict(labels)
+        self.profiler = None
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        if self.name in self.recorder.trace_memory_stages:
+            self.memory_start, self.memory_entry, self.memory_shared = self.recorder.start_memory_span()
+        if self.name in self.recorder.profile_stages:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.fields["profile"] = self.recorder.dump_profile(self.name, self.profiler)
+        if self.name in self.recorder.trace_memory_stages:
+            peak, shared = self.recorder.finish_memory_span(self.memory_entry)
+            self.fields["peak_bytes"] = max(peak - self.memory_start, 0)
+            if shared or self.memory_shared:
+                self.fields["peak_shared"] = True  # Overlapped other traced spans: the peak includes theirs
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        self.recorder.finish_span(self.name, duration, self.fields)
+        return False
+
+
+class Recorder:
+    """
+    Collects spans and counters: aggregates them for Prometheus text export and optionally
+    streams every span as a JSON line. Thread-safe (fetches run on a thread pool).
+    """
+
+    def __init__(self, jsonl_path=None, profile_stages=(), trace_memory_stages=(), profile_dir=PROFILE_DIR):
+        self.lock = threading.Lock()
+        self.jsonl = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+        self.profile_stages = set(profile_stages)
+        self.trace_memory_stages = set(trace_memory_stages)
+        self.profile_dir = profile_dir
+        self.profiles = 0
+        self.memory_spans = 0  # Traced spans currently open (tracemalloc is process-global)
+        self.memory_entries = 0  # Traced spans entered so far, to detect overlaps
+        self.started_tracing = False
+        self.spans = {}  # name -> [count, total seconds, max seconds, errors]
+        self.counters = {}  # (name, sorted labels) -> value
+
+    def start_memory_span(self):
+        """
+        Starts tracing memory for a span. Tracing is reference-counted across spans (e.g. fetches
+        on several threads): it starts with the first open span and stops with the last, and the
+        peak is only reset while no other traced span is open.
+        Returns (current traced bytes, entry number, whether other traced spans are open).
+        """
+        with self.lock:
+            if self.memory_spans == 0:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self.started_tracing = True
+                tracemalloc.reset_peak()
+            shared = self.memory_spans > 0
+            self.memory_spans += 1
+            self.memory_entries += 1
+            return tracemalloc.get_traced_memory()[0], self.memory_entries, shared
+
+    def finish_memory_span(self, entry):
+        """
+        Returns (traced peak bytes, whether another traced span started after entry).
+        """
+        with self.lock:
+            peak = tracemalloc.get_traced_memory()[1]
+            shared = self.memory_entries != entry
+            self.memory_spans -= 1
+            if self.memory_spans == 0 and self.started_tracing:
+                tracemalloc.stop()
+                self.started_tracing = False
+            return peak, shared
+
+    def finish_span(self, name, duration, fields):
+        with self.lock:
+            summary = self.spans.setdefault(name, [0, 0.0, 0.0, 0])
+            summary[0] += 1
+            summary[1] += duration
+            summary[2] = max(summary[2], duration)
+            summary[3] += "error" in fields
+            if self.jsonl is not None:
+                event = {"type": "span", "name": name, "time": time.time(), "duration_s": duration, **fields}
+                self.jsonl.write(json.dumps(event, default=str) + "\n")
+
+    def count(self, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def dump_profile(self, name, profiler):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        with self.lock:
+            self.profiles += 1
+            path = os.path.join(self.profile_dir, f"{name}-{os.getpid()}-{self.profiles}.prof")
+        profiler.dump_stats(path)
+        return path
+
+    def snapshot(self):
+        """
+        Returns the aggregated spans and counters as a dict.
+        """
+        with self.lock:
+            spans = {name: {"count": count, "seconds": total, "max_seconds": longest, "errors": errors}
+                     for name, (count, total, longest, errors) in self.spans.items()}
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in self.counters.items()]
+        return {"spans": spans, "counters": counters}
+
+    def to_prometheus(self, prefix="price_"):
+        """
+        Renders the aggregated metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        if snapshot["spans"]:
+            lines += [f"# TYPE {prefix}stage_seconds summary"]
+            for name, summary in sorted(snapshot["spans"].items()):
+                lines.append(f'{prefix}stage_seconds_count{{stage="{name}"}} {summary["count"]}')
+                lines.append(f'{prefix}stage_seconds_sum{{stage="{name}"}} {summary["seconds"]:.9f}')
+            lines += [f"# TYPE {prefix}stage_seconds_max gauge"]
+            lines += [f'{prefix}stage_seconds_max{{stage="{name}"}} {summary["max_seconds"]:.9f}'
+                      for name, summary in sorted(snapshot["spans"].items())]
+            lines += [f"# TYPE {prefix}stage_errors_total counter"]
+            lines += [f'{prefix}stage_errors_total{{stage="{name}"}} {summary["errors"]}'
+                      for name, summary in sorted(snapshot["spans"].items())]
+
+        declared = set()
+        for counter in sorted(snapshot["counters"], key=lambda counter: counter["name"]):
+            name = f"{prefix}{counter['name']}_total"
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            labels = ",".join(f'{key}="{value}"' for key, value in counter["labels"].items())
+            lines.append(f"{name}{{{labels}}} {counter['value']}" if labels else f"{name} {counter['value']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+
+    def close(self):
+        with self.lock:
+            if self.jsonl is not None:
+                self.jsonl.close()
+                self.jsonl = None
+
+
+recorder = None  # The active Recorder, or None while instrumentation is disabled
+
+
+def span(name, **labels):
+    """
+    Returns a context manager timing a stage, e.g.
+        with instrumentation.span("fetch", page=3) as fetch:
+            ...
+            fetch.set(bytes=len(content), status=200)
+    """
+    if recorder is None:
+        return NULL_SPAN
+    return Span(recorder, name, labels)
+
+
+def record(name, seconds, **fields):
+    """
+    Records a span that was timed elsewhere, e.g. in a worker process without a recorder.
+    """
+    if recorder is not None:
+        recorder.finish_span(name, seconds, fields)
+
+
+def count(name, value=1, **labels):
+    """
+    Adds value to a counter (exported as <name>_total).
+    """
+    if recorder is not None:
+        recorder.count(name, value, labels)
+
+
+def enable(jsonl_path=None, prometheus_path=None, profile_stages=(), trace_memory_stages=(),
+           profile_dir=PROFILE_DIR):
+    """
+    Turns instrumentation on. Spans go to jsonl_path as they finish; the aggregated metrics are
+    written to prometheus_path when the process exits. Stages named in profile_stages run under
+    cProfile (one .prof file per run in profile_dir); stages in trace_memory_stages report their
+    tracemalloc peak as peak_bytes.
+    """
+    global recorder
+    disable()
+    recorder = Recorder(jsonl_path, profile_stages, trace_memory_stages, profile_dir)
+    if prometheus_path:
+        atexit.register(recorder.write_prometheus, prometheus_path)
+    return recorder
+
+
+def disable():
+    global recorder
+    if recorder is not None:
+        recorder.close()
+    recorder = None
+
+
+def enable_from_environment():
+    """
+    Enables instrumentation if any of the PRICE_METRICS_* / PRICE_*_STAGES variables is set.
+    """
+    def stages(variable):
+        return [stage.strip() for stage in os.environ.get(variable, "").split(",") if stage.strip()]
+
+    settings = {"jsonl_path": os.environ.get(ENV_JSONL), "prometheus_path": os.environ.get(ENV_PROMETHEUS),
+                "profile_stages": stages(ENV_PROFILE), "trace_memory_stages": stages(ENV_TRACE_MEMORY)}
+    if any(settings.values()):
+        enable(**settings)
+
+
+enable_from_environment()
@@ -0,0 +1,164 @@
+import os
+import numpy as np
+
+
+class ListingIndex:
+    """
+    In-memory index of the listings a model was trained on: their category codes (one uint8
+    column per feature) and prices, for "the k actual listings most similar to this configuration".
+
+    Similarity is the number of features whose category matches; ties are broken by how close
+    a listing's price is to the estimate. Listings are grouped by their full code combination
+    (at most a few thousand distinct configurations, however many listings there are) with each
+    group's rows sorted by price, so a query scores the groups instead of every listing and only
+    binary-searches the best groups for the prices nearest the estimate.
+    """
+
+    def __init__(self, columns, vocabularies, codes, prices):
+        """
+        :param columns: Feature names, in code column order.
+        :param vocabularies: Dict of feature -> list of categories (code = position).
+        :param codes: (listings, features) array of category codes.
+        :param prices: Listing prices, aligned with codes.
+        """
+        self.columns = list(columns)
+        self.vocabularies = {column: list(vocabularies[column]) for column in self.columns}
+        self.positions = {column: {category: code for code, category in enumerate(values)}
+                          for column, values in self.vocabularies.items()}
+        self.codes = np.asarray(codes, dtype=np.uint8).reshape(-1, len(self.columns))
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.group_codes = None  # Built on the first query, so loading a model stays fast
+
+    @property
+    def size(self):
+        return len(self.prices)
+
+    @staticmethod
+    def from_frame(features, target):
+        """
+        Builds an index from categorized feature columns (fixed-vocabulary categoricals) and prices.
+        Listings without a price are left out.
+        """
+        prices = np.asarray(target, dtype=np.float64)
+        valid = ~np.isnan(prices)
+        columns = list(features.columns)
+        codes = np.column_stack([features[column].cat.codes.to_numpy() for column in columns])
+        vocabularies = {column: list(features[column].cat.categories) for column in columns}
+        return ListingIndex(columns, vocabularies, codes[valid], prices[valid])
+
+    def extend(self, other):
+        """
+        Returns an index holding the listings of both indexes (other's codes are translated
+        to this index's vocabularies; categories it does not know are appended).
+        """
+        vocabularies = {column: list(values) for column, values in self.vocabularies.items()}
+        translated = np.empty_like(other.codes)
+        for j, column in enumerate(self.columns):
+            lookup = []
+            for category in other.vocabularies[column]:
+                if category not in vocabularies[column]:
+                    vocabularies[column].append(category)
+                lookup.append(vocabularies[column].index(category))
+            translated[:, j] = np.array(lookup, dtype=np.uint8)[other.codes[:, other.columns.index(column)]]
+        return ListingIndex(self.columns, vocabularies, np.vstack([self.codes, translated]),
+                            np.concatenate([self.prices, other.prices]))
+
+    def build_groups(self):
+        """
+        Sorts the listings by code combination, then price, and records where every group starts.
+        """
+        order = np.lexsort((self.prices,) + tuple(self.codes[:, j] for j in reversed(range(len(self.columns)))))
+        sorted_codes = self.codes[order]
+        starts = np.flatnonzero(np.r_[True, (sorted_codes[1:] != sorted_codes[:-1]).any(axis=1)])
+        self.row_order = order
+        self.sorted_prices = self.prices[order]
+        self.group_starts = np.r_[starts, len(order)]
+        # Prices shifted by group so one searchsorted finds the estimate's position in many groups at once
+        self.price_floor = float(self.prices.min())
+        self.group_stride = float(np.ptp(self.prices)) + 1.0
+        group_of_row = np.repeat(np.arange(len(starts)), np.diff(self.group_starts))
+        self.keyed_prices = self.sorted_prices - self.price_floor + group_of_row * self.group_stride
+        # Set last: a built group_codes means the index is ready (the server builds it on another thread)
+        self.group_codes = [np.ascontiguousarray(sorted_codes[starts, j]) for j in range(len(self.columns))]
+
+    def match_counts(self, configuration):
+        """
+        Number of features every group shares with a categorized configuration (dict);
+        unknown or missing features never match.
+        """
+        scores = np.zeros(len(self.group_codes[0]), dtype=np.uint8)
+        for column, codes in zip(self.columns, self.group_codes):
+            code = self.positions[column].get(configuration.get(column))
+            if code is not None:
+                scores += codes == code
+        return scores
+
+    def nearest(self, configuration, k=5, estimate=None):
+        """
+        Returns the k most similar listings to a categorized configuration as a list of dicts
+        (categories, price and the number of matching features), best first. Without an
+        estimate, ties are broken by closeness to the median price.
+        """
+        if self.size == 0 or k <= 0:
+            return []
+        if self.group_codes is None:
+            self.build_groups()
+        if estimate is None:
+            estimate = float(np.median(self.prices))
+
+        scores = self.match_counts(configuration)
+        results = []  # (score, position in the sorted listings), best first
+        for score in range(len(self.columns), -1, -1):
+            if len(results) >= k:
+                break
+            groups = np.flatnonzero(scores == score)
+            if len(groups) == 0:
+                continue
+            # The k prices of a group closest to the estimate lie within k of its insertion point
+            target = np.clip(estimate - self.price_floor, 0.0, self.group_stride - 1.0) + groups * self.group_stride
+            middles = np.searchsorted(self.keyed_prices, target)
+            windows = middles[:, None] + np.arange(-k, k)
+            inside = (windows >= self.group_starts[groups, None]) & (windows < self.group_starts[groups + 1, None])
+            candidates = windows[inside]
+            distances = np.abs(self.sorted_prices[candidates] - estimate)
+            best = np.argsort(distances, kind="stable")[:k - len(results)]
+            results += [(score, position) for position in candidates[best]]
+
+        listings = []
+        for score, position in results:
+            row = self.row_order[position]
+            listing = {column: self.vocabularies[column][code] for column, code in zip(self.columns, self.codes[row])}
+            listing.update(price=float(self.prices[row]), matches=int(score))
+            listings.append(listing)
+        return listings
+
+    def save(self, path, token):
+        """
+        Writes the index to its own .npz file (it grows with the dataset, so it is kept out of
+        the model artifact). token ties the file to the artifact it was saved with.
+        The file is written to a temporary name first and renamed, like the artifact.
+        """
+        arrays = {"token": np.array(token), "columns": np.array(self.columns, dtype=str),
+                  "codes": self.codes, "prices": self.prices}
+        for i, column in enumerate(self.columns):
+            arrays[f"vocab_{i}"] = np.array(self.vocabularies[column], dtype=str)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path, token):
+        """
+        Reads an index saved with save, or returns None if the file is missing, unreadable
+        or belongs to another artifact (a different token).
+        """
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                if str(arrays["token"]) != token:
+                    return None
+                columns = arrays["columns"].tolist()
+                vocabularies = {column: arrays[f"vocab_{i}"].tolist() for i, column in enumerate(columns)}
+                return ListingIndex(columns, vocabularies, arrays["codes"], arrays["prices"])
+        except (OSError, KeyError, ValueError):
+            return None
@@ -0,0 +1,195 @@
+import time
+import bs4
+import numpy as np
+
+# Bump when the extraction rules change, so rows cached for unchanged pages are re-parsed
+PARSER_VERSION = 1
+
+# Columns produced for every listing, in DataFrame order (price is the target and stays last)
+COLUMNS = ('processor', 'disk', 'ram', 'os', 'condition', 'graphic_card', 'price')
+
+# Polish specification labels for each field.
+# Substring labels match any label cell containing them, exact labels must match the whole cell.
+FIELD_LABELS = {
+    'processor': {'substring': ('Model procesora:', 'Procesor:')},
+    'disk': {'substring': ('Dysk:', 'Pojemność dysku:')},
+    'ram': {'substring': ('Pamięć: RAM:', 'Ilość pamięci RAM:')},
+    'os': {'exact': ('System operacyjny:',)},
+    'condition': {'exact': ('Stan:',)},
+    'graphic_card': {'exact': ('Karta graficzna:',)},
+}
+
+LABEL_CLASS = 'kp-tabela-tdleft'
+VALUE_CLASS = 'kp-tabela-tdright'
+BLOCK_CLASS = 'decriptions-short'
+PRICE_CLASSES = ['product-price-and-shipping', 'hidden-md-up']
+
+
+
+def is_listing_class(value):
+    """
+    Class filter for listing blocks and price boxes. While parsing, the strainer
+    sees the raw class attribute (e.g. "product-price-and-shipping hidden-md-up"), so split it.
+    """
+    return value is not None and any(name in (BLOCK_CLASS, PRICE_CLASSES[0]) for name in value.split())
+
+
+# Only the listing blocks and price boxes are built into the parse tree
+LISTING_STRAINER = bs4.SoupStrainer('div', class_=is_listing_class)
+
+
+def choose_backend(preferred=None):
+    """
+    Returns the BeautifulSoup backend to use: the preferred one if given,
+    otherwise lxml when it is installed and the built-in html.parser as a fallback.
+    """
+    if preferred:
+        return preferred
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+def clean_value(field, text):
+    """
+    Normalizes a raw specification value the same way for every page.
+    """
+    text = text.strip()
+    if field in ('ram', 'condition'):
+        return text
+    text = text.replace("\xa0", "")
+    if field == 'os':
+        text = text.replace("Windows 11 Pro", "Windows 11Pro")
+    return text
+
+
+def match_label(label):
+    """
+    Returns the fields whose Polish label matches the given label cell text.
+    """
+    fields = []
+    for field, labels in FIELD_LABELS.items():
+        if label in labels.get('exact', ()) or any(key in label for key in labels.get('substring', ())):
+            fields.append(field)
+    return fields
+
+
+def parse_price(text):
+    """
+    Converts a price such as "1 299,00 zł" to a float, or NaN if there is no price.
+    """
+    if text is None:
+        return np.nan
+    return float(text.replace(" ", "").replace(",", ".").replace("zł", "").replace("\xa0", ""))
+
+
+def collect_values(cells):
+    """
+    Builds a field -> value map from (is_label, label_string, value_text) cells of one
+    specification table, visited once in document order.
+    The first matching label wins and takes the value cell that follows it.
+    """
+    values = {}
+    waiting = []  # Fields whose label was seen but whose value cell has not been reached yet
+    for is_label, label, text in cells:
+        if is_label:
+            if label is not None:
+                waiting.extend(field for field in match_label(label) if field not in values and field not in waiting)
+        elif waiting:
+            for field in waiting:
+                values[field] = clean_value(field, text())
+            waiting = []
+    return values
+
+
+def make_row(values, price):
+    """
+    Orders the extracted values like COLUMNS, filling missing fields with NaN.
+    """
+    return tuple(values.get(field, np.nan) for field in COLUMNS[:-1]) + (price,)
+
+
+def parse_with_bs4(content, backend):
+    """
+    Parses a listing page with BeautifulSoup, building only the listing blocks and price boxes.
+    """
+    soup = bs4.BeautifulSoup(content, backend, parse_only=LISTING_STRAINER)
+
+    rows = []
+    price = np.nan  # Price of the closest price box preceding the current block
+    for element in soup.find_all('div', class_=is_listing_class):
+        classes = element.get('class', [])
+        if classes == PRICE_CLASSES:
+            price_span = element.find('span', class_='price')
+            price = parse_price(price_span.text if price_span else None)
+        elif BLOCK_CLASS in classes:
+            cells = ((LABEL_CLASS in cell.get('class', []), cell.string, lambda cell=cell: cell.text)
+                     for cell in element.find_all('td', class_=[LABEL_CLASS, VALUE_CLASS]))
+            rows.append(make_row(collect_values(cells), price))
+    return rows
+
+
+def element_string(element):
+    """
+    lxml equivalent of BeautifulSoup's Tag.string: the text of an element whose only
+    content is a single string, following single-child elements; otherwise None.
+    """
+    while True:
+        children = list(element)
+        if not children:
+            return element.text
+        if len(children) > 1 or element.text or children[0].tail:
+            return None
+        element = children[0]
+
+
+def parse_with_lxml(content):
+    """
+    Parses a listing page directly with lxml (no BeautifulSoup tree), with the same
+    extraction rules as parse_with_bs4.
+    """
+    import lxml.html
+
+    root = lxml.html.fromstring(bs4.UnicodeDammit(content, ['utf-8']).unicode_markup)
+
+    rows = []
+    price = np.nan  # Price of the closest price box preceding the current block
+    for element in root.iter('div'):
+        classes = (element.get('class') or '').split()
+        if classes == PRICE_CLASSES:
+            price_span = next((span for span in element.iter('span')
+                               if 'price' in (span.get('class') or '').split()), None)
+            price = parse_price(price_span.text_content() if price_span is not None else None)
+        elif BLOCK_CLASS in classes:
+            cells = []
+            for cell in element.iter('td'):
+                cell_classes = (cell.get('class') or '').split()
+                if LABEL_CLASS in cell_classes:
+                    cells.append((True, element_string(cell), None))
+                elif VALUE_CLASS in cell_classes:
+                    cells.append((False, None, cell.text_content))
+            rows.append(make_row(collect_values(cells), price))
+    return rows
+
+
+def parse_listing_page(content, backend=None):
+    """
+    Parses one listing page in a single pass over its listing blocks and price boxes.
+    Returns a list of row tuples ordered like COLUMNS (missing values are NaN).
+    """
+    backend = choose_backend(backend)
+    if backend == 'lxml':
+        return parse_with_lxml(content)
+    return parse_with_bs4(content, backend)
+
+
+def timed_parse(content, backend=None):
+    """
+    Parses a listing page in a parser process; returns (rows, seconds) so the parent
+    can record the "parse" span the child has no recorder for.
+    """
+    start = time.perf_counter()
+    rows = parse_listing_page(content, backend)
+    return rows, time.perf_counter() - start
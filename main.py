@@ -1,6 +1,242 @@
-from app import App
+import argparse
+import os
+import sys
+import time
+from model import BATCH_CHUNK_SIZE, PredictionModel
+
+
+def predict_batch(args):
+    """
+    Prices configurations from a CSV or Parquet file without starting the GUI.
+    """
+    model = PredictionModel(load_existing=True)
+    if not model.is_trained():
+        print("❌ Error: No trained model available – train it in the GUI first.")
+        return 1
+
+    start = time.perf_counter()
+    rows = model.predict_file(args.input, args.output, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Priced {rows} configurations in {elapsed:.2f}s ({rows / max(elapsed, 1e-9) * 60:,.0f} rows/min) "
+          f"-> {args.output}")
+    return 0
+
+
+def parse_assignments(items, split_values=False):
+    """
+    Parses "feature=value" arguments into a dict (values split on commas if requested).
+    """
+    parsed = {}
+    for item in items or []:
+        feature, _, value = item.partition("=")
+        parsed[feature.strip()] = [v.strip() for v in value.split(",")] if split_values else value.strip()
+    return parsed
+
+
+def load_trained_model():
+    """
+    Loads the saved model, or prints an error and returns None.
+    """
+    model = PredictionModel(load_existing=True)
+    if not model.is_trained() or model.price_cube is None:
+        print("❌ Error: No trained model available – train it in the GUI first.")
+        return None
+    return model
+
+
+def read_constraints(model, args):
+    """
+    Builds the constraints of a query from --require and --at-least arguments.
+    """
+    constraints = parse_assignments(args.require, split_values=True)
+    for feature, option in parse_assignments(args.at_least).items():
+        constraints[feature] = model.price_cube.at_least(feature, option)
+    return constraints
+
+
+def query_configurations(args):
+    """
+    Lists configurations by budget and constraints, e.g. all under 2000 zł with at least 32GB RAM.
+    """
+    model = load_trained_model()
+    if model is None:
+        return 1
+    results = model.query_configurations(max_price=args.max_price, min_price=args.min_price,
+                                         constraints=read_constraints(model, args), limit=args.limit,
+                                         descending=args.descending)
+    for row in results:
+        print(f"{row['price']:10.2f} zł  " + ", ".join(row[column] for column in model.price_cube.columns))
+    print(f"{len(results)} configurations")
+    return 0
+
+
+def upgrade_configuration(args):
+    """
+    Prints the cheapest upgrade path from a configuration to one satisfying the constraints.
+    """
+    model = load_trained_model()
+    if model is None:
+        return 1
+    configuration = parse_assignments(args.config)
+    result = model.cheapest_upgrade(configuration, read_constraints(model, args))
+    if result is None:
+        print("❌ No configuration satisfies the constraints.")
+        return 1
+
+    print(f"Current price: {model.price_cube.price(configuration):.2f} zł")
+    for step in result["steps"]:
+        print(f"  {step['feature']}: {step['from']} -> {step['to']}  ({step['price']:.2f} zł)")
+    print(f"Upgrade cost: {result['delta']:+.2f} zł, new price {result['price']:.2f} zł")
+    return 0
+
+
+def similar_listings(args):
+    """
+    Prints the stored listings most similar to a configuration, with their prices.
+    """
+    model = load_trained_model()
+    if model is None:
+        return 1
+    if not model.has_listing_index():
+        print("❌ Error: The saved model has no listing index – train it again in the GUI.")
+        return 1
+    configuration = parse_assignments(args.config)
+    if len(configuration) == len(model.feature_columns):
+        print(f"Estimated price: {model.score_configuration(configuration):.2f} zł")
+    for listing in model.similar_listings(configuration, args.k):
+        print(f"{listing['price']:10.2f} zł  {listing['matches']}/{len(model.feature_columns)} match  "
+              + ", ".join(listing[column] for column in model.feature_columns))
+    return 0
+
+
+def scrape(args):
+    """
+    Streams the listings into a Parquet file without starting the GUI.
+    """
+    from data import Data  # Scraping dependencies are only needed for this command
+    from pipeline import ListingPipeline, ParquetSink
+
+    data = Data(parse_workers=args.parse_workers)
+    if data.main_page is None:
+        print("❌ Error: Failed to retrieve data from the website!")
+        return 1
+    start = time.perf_counter()
+    pipeline = ListingPipeline(data, args.parse_workers, args.queue_depth, normalize=args.normalize)
+    rows = pipeline.run(ParquetSink(args.output))
+    print(f"✅ Scraped {rows} listings in {time.perf_counter() - start:.2f}s -> {args.output}")
+    return 0
+
+
+def manage_models(args):
+    """
+    Lists the registered model versions, rolls back or activates one.
+    """
+    import datetime
+    from model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    if args.action == "rollback":
+        key = registry.rollback()
+        print(f"✅ Rolled back to model {key}" if key else "❌ There is no earlier model to roll back to.")
+        return 0 if key else 1
+    if args.action == "activate":
+        if not args.key:
+            print("❌ Error: activate needs a model key.")
+            return 1
+        matches = [entry["key"] for entry in registry.entries() if entry["key"].startswith(args.key)]
+        if len(matches) != 1:
+            print(f"❌ Error: {args.key} matches {len(matches)} models.")
+            return 1
+        print(f"✅ Activated model {registry.activate(matches[0])}")
+        return 0
+
+    for entry in registry.entries():
+        created = datetime.datetime.fromtimestamp(entry["created"]).strftime("%Y-%m-%d %H:%M")
+        print(f"{'*' if entry['active'] else ' '} {entry['key']}  {created}  "
+              f"{entry.get('trained_rows', '?'):>8} rows  {entry.get('estimator') or ''}")
+    return 0
+
+
+def serve(args):
+    """
+    Runs the local HTTP/JSON prediction server.
+    """
+    from prediction_server import run_server  # asyncio server, only needed for this command
+    run_server(args.host, args.port, max_batch_rows=args.max_batch_rows, max_batch_wait=args.max_batch_wait_ms / 1000)
+    return 0
+
+
+def add_constraint_arguments(parser):
+    parser.add_argument("--require", action="append", metavar="FEATURE=A,B",
+                        help="Allowed options of a feature (repeatable), e.g. --require disk=SSD,NVMe")
+    parser.add_argument("--at-least", action="append", metavar="FEATURE=OPTION",
+                        help="Minimum option of an ordered feature (repeatable), e.g. --at-least ram=32GB")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Computer Price Prediction. Without a command, starts the GUI.")
+    commands = parser.add_subparsers(dest="command")
+
+    batch = commands.add_parser("predict", help="Price configurations from a CSV or Parquet file (no GUI)")
+    batch.add_argument("input", help="CSV or Parquet file with processor, disk, ram, os, condition, graphic_card")
+    batch.add_argument("output", help="Output file (.csv or .parquet) with an added predicted_price column")
+    batch.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="Rows processed at a time")
+
+    query = commands.add_parser("query", help="List configurations by budget and constraints, sorted by price")
+    query.add_argument("--max-price", type=float)
+    query.add_argument("--min-price", type=float)
+    query.add_argument("--limit", type=int, default=20)
+    query.add_argument("--descending", action="store_true", help="Most expensive first")
+    add_constraint_arguments(query)
+
+    upgrade = commands.add_parser("upgrade", help="Cheapest upgrade path from a configuration to the constraints")
+    upgrade.add_argument("--config", action="append", required=True, metavar="FEATURE=OPTION",
+                         help="Current configuration, one feature per argument")
+    add_constraint_arguments(upgrade)
+
+    similar = commands.add_parser("similar", help="Stored listings most similar to a configuration, with prices")
+    similar.add_argument("--config", action="append", required=True, metavar="FEATURE=OPTION",
+                         help="Configuration, one feature per argument (missing features match nothing)")
+    similar.add_argument("-k", type=int, default=5, help="Number of listings")
+
+    scraper = commands.add_parser("scrape", help="Stream the scraped listings into a Parquet file (no GUI)")
+    scraper.add_argument("output", help="Output .parquet file")
+    scraper.add_argument("--normalize", action="store_true", help="Store model categories instead of raw values")
+    scraper.add_argument("--parse-workers", type=int, default=os.cpu_count(),
+                         help="Parser processes (default: one per core)")
+    scraper.add_argument("--queue-depth", type=int, default=16, help="Pages held at most per pipeline stage")
+
+    models = commands.add_parser("models", help="List, roll back or activate registered model versions")
+    models.add_argument("action", nargs="?", choices=["list", "rollback", "activate"], default="list")
+    models.add_argument("key", nargs="?", help="Model key (or a unique prefix) for activate")
+
+    server = commands.add_parser("serve", help="Serve predictions over HTTP/JSON (POST /predict, GET /metrics)")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8765)
+    server.add_argument("--max-batch-rows", type=int, default=4096, help="Rows priced by one vectorized call at most")
+    server.add_argument("--max-batch-wait-ms", type=float, default=2.0,
+                        help="How long a batch waits for more concurrent requests")
+    return parser.parse_args(argv)
+
 
 # Main entry point of the application
 if __name__ == '__main__':
+    args = parse_args()
+    if args.command == "predict":
+        sys.exit(predict_batch(args))
+    if args.command == "query":
+        sys.exit(query_configurations(args))
+    if args.command == "upgrade":
+        sys.exit(upgrade_configuration(args))
+    if args.command == "similar":
+        sys.exit(similar_listings(args))
+    if args.command == "scrape":
+        sys.exit(scrape(args))
+    if args.command == "models":
+        sys.exit(manage_models(args))
+    if args.command == "serve":
+        sys.exit(serve(args))
+
+    from app import App  # The GUI (tkinter/ttkbootstrap) is only imported when needed
     app = App()  # Initialize the application
     app.run()  # Start the application
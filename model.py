@@ -1,14 +1,38 @@
 import os
 import pickle
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.compose import ColumnTransformer
+import re
+import uuid
+from functools import lru_cache
 import numpy as np
+import instrumentation
+from listing_index import ListingIndex
+from model_artifact import ARTIFACT_VERSION, listings_path, read_artifact, write_artifact
+from model_registry import ModelRegistry
+from model_selection import select_model
+from price_cube import PriceCube
+from sufficient_stats import SufficientStatistics
+
+# pandas and scikit-learn are imported inside the methods that need them, so loading a model
+# and scoring single configurations (GUI startup and clicks) only requires NumPy.
 
 # Define the filename for saving/loading the trained model
-MODEL_FILENAME = "model.pkl"
+MODEL_FILENAME = "model.npz"
+LEGACY_MODEL_FILENAME = "model.pkl"  # Pickled models from older versions, migrated on load
+# Part of every model registry key: bump when a training change makes cached models stale
+TRAINING_VERSION = 2
+
+# Number of rows read, predicted and written at a time in batch prediction
+BATCH_CHUNK_SIZE = 100_000
+PREDICTION_COLUMN = "predicted_price"
+
+
+def compile_category_pattern(mapping):
+    """
+    Compiles the mapping keys of one column into a single alternation regex.
+    Each key has its own group and the alternatives are tried in mapping order,
+    so the first key found anywhere in the value wins, like a linear substring scan.
+    """
+    return re.compile("^(?:" + "|".join(f".*?({re.escape(key)})" for key in mapping) + ")", re.DOTALL)
 
 class PredictionModel:
     """
@@ -32,42 +56,190 @@ class PredictionModel:
         "condition": {"Nowy": "New", "Bardzo dobry": "Very Good", "Używany": "Used", "Uszkodzony": "Damaged"}
     }
 
-    def __init__(self, data=None, load_existing=True):
+    # Options offered in the GUI for every feature (RAM in increasing order)
+    INPUT_OPTIONS = {
+        "processor": ["Intel i3", "Intel i5", "Intel i7", "Intel i9", "Intel Xeon",
+                      "AMD Ryzen 3", "AMD Ryzen 5", "AMD Ryzen 7", "AMD Ryzen 9"],
+        "graphic_card": ["NVIDIA GTX", "NVIDIA RTX", "AMD Radeon", "NVIDIA Quadro", "Intel Integrated"],
+        "ram": ["8GB", "16GB", "32GB", "64GB"],
+        "disk": ["HDD", "SSD", "NVMe"],
+        "os": ["Windows", "Linux", "No OS"],
+        "condition": ["New", "Very Good", "Used", "Damaged"]
+    }
+
+    # Precompiled alternation regex and group -> category list for every column
+    CATEGORY_PATTERNS = {column: (compile_category_pattern(mapping), [None] + list(mapping.values()))
+                         for column, mapping in CATEGORICAL_MAPPINGS.items()}
+    # Categories a value may already be (GUI options such as "New" or "No OS" are category names, not raw text)
+    CANONICAL_CATEGORIES = {column: set(mapping.values()) for column, mapping in CATEGORICAL_MAPPINGS.items()}
+
+    # Parallel cross-validation of the candidate estimators (-1 uses every core)
+    SELECTION_FOLDS = 5
+    SELECTION_JOBS = -1
+
+    def __init__(self, data=None, load_existing=True, progress=None, base_statistics=None, registry=None,
+                 base_index=None):
         """
-        Initializes the prediction model. Loads an existing model if available,
-        otherwise trains a new one if data is provided.
+        Initializes the prediction model. With data, trains on it, unless load_existing is set
+        and the model registry already holds a model trained on exactly this data.
+        Without data, loads the active model if available.
+
+        :param progress: Optional ProgressChannel for reporting training stages and cancellation.
+        :param base_statistics: Sufficient statistics of an earlier model; data is then folded
+                                into a copy of them instead of refitting from scratch.
+        :param registry: ModelRegistry that trained models are stored in (default: ./models).
+        :param base_index: ListingIndex of the model base_statistics belong to; the new listings are appended.
         """
         self.features = None  # Model features
         self.target = None  # Model target variable (price)
-        self.encoder = None  # OneHotEncoder instance
+        self.encoder = None  # OneHotEncoder instance (only in models pickled by older versions)
         self.model = None  # The trained Linear Regression model
+        self.feature_columns = None  # Names of the feature columns, in training order
+        self.lookup_tables = None  # Per-feature category -> contribution tables compiled from the model
+        self.intercept = None  # Intercept of the compiled tables
+        self.price_cube = None  # Prices of all GUI-selectable configurations
+        self.statistics = None  # Sufficient statistics (ZᵀZ, Zᵀy) for incremental training
+        self.estimator_name = None  # Estimator chosen by cross-validation
+        self.dataset_key = None  # Registry key of the training data
+        self.listing_index = None  # Codes and prices of the training listings, for comparable listings
+        self.listing_index_file = None  # (path, token) the listing index is read from on first use
+
+        # Fresh data is never ignored in favour of the saved model: it is trained on or matched in the registry
+        if data is not None:
+            self.train_or_reuse(data, load_existing, progress, base_statistics, registry, base_index)
+            return
 
-        if load_existing and os.path.exists(MODEL_FILENAME):
-            loaded_model = self.load_model()
-            if loaded_model:
-                self.__dict__.update(loaded_model.__dict__)
+        if load_existing and (os.path.exists(MODEL_FILENAME) or os.path.exists(LEGACY_MODEL_FILENAME)):
+            loaded_state = self.load_model()
+            if loaded_state:
+                self.__dict__.update(loaded_state)
+                self.build_price_cube()
                 return
 
-        # If no existing model is found, check if data is provided to train a new model
-        if data is not None:
-            self.train_new_model(data)
+        print("⚠️ No model found – train it first.")
+
+    def train_or_reuse(self, data, reuse, progress=None, base_statistics=None, registry=None, base_index=None):
+        """
+        Trains on data (incrementally from base_statistics if given) and stores the model in the
+        registry under the hash of the data and code version. If reuse is set and that hash is
+        already registered, the cached model is activated instead of training again.
+        """
+        registry = registry if registry is not None else ModelRegistry()
+        extra = b"" if base_statistics is None else base_statistics.ztz.tobytes() + base_statistics.zty.tobytes()
+        key = registry.dataset_key(data, f"{TRAINING_VERSION}-{ARTIFACT_VERSION}", extra)
+
+        if reuse:
+            cached_state = registry.load(key)
+            if cached_state:
+                print(f"♻️ Training data unchanged – reusing cached model {key[:8]}.")
+                self.__dict__.update(cached_state)
+                self.dataset_key = key
+                self.build_price_cube()
+                return
+
+        if base_statistics is not None:
+            saved = self.train_incremental(data, base_statistics.copy(), progress, base_index)
         else:
-            print("⚠️ No model found – train it first.")
+            saved = self.train_new_model(data, progress)
+        if saved:
+            self.dataset_key = key
+            registry.add(key, MODEL_FILENAME, {"trained_rows": self.statistics.rows if self.statistics else len(data),
+                                               "estimator": self.estimator_name})
 
     def categorize_feature(self, feature_type, value):
         """
         Standardizes categorical feature values based on predefined mappings.
         """
         if isinstance(value, str):
-            for key, category in self.CATEGORICAL_MAPPINGS.get(feature_type, {}).items():
-                if key in value:
-                    return category
+            return self.categorize_string(feature_type, value)
         return "Other"
 
-    def train_new_model(self, data):
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def categorize_string(feature_type, value):
+        """
+        Maps a raw string to its category with the column's precompiled regex (memoized).
+        A value that already is a category of the column maps to itself.
+        """
+        if feature_type not in PredictionModel.CATEGORY_PATTERNS:
+            return "Other"
+        if value in PredictionModel.CANONICAL_CATEGORIES[feature_type]:
+            return value
+        pattern, categories = PredictionModel.CATEGORY_PATTERNS[feature_type]
+        match = pattern.match(value)
+        return categories[match.lastindex] if match else "Other"
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def category_dtype(feature_type):
+        """
+        Returns the fixed pandas CategoricalDtype of a feature: its mapped categories
+        in mapping order followed by "Other".
+        """
+        import pandas as pd
+
+        mapping = PredictionModel.CATEGORICAL_MAPPINGS.get(feature_type, {})
+        return pd.CategoricalDtype(list(dict.fromkeys(mapping.values())) + ["Other"])
+
+    def categorize_column(self, feature_type, values):
+        """
+        Standardizes a whole column at once: every distinct raw value is categorized once
+        and the result is broadcast back to the rows through the factorized codes.
+        Returns a pandas Categorical with the feature's fixed category_dtype; columns that
+        already have that dtype are returned unchanged (categorizing is not idempotent).
+        """
+        import pandas as pd
+
+        dtype = self.category_dtype(feature_type)
+        if isinstance(values.dtype, pd.CategoricalDtype) and values.dtype == dtype:
+            return pd.Categorical(values, dtype=dtype)
+
+        codes, uniques = pd.factorize(values)
+        categories = [self.categorize_feature(feature_type, value) for value in uniques]
+        categories.append("Other")  # Missing values have code -1
+        lookup = dtype.categories.get_indexer(categories).astype(np.int8)
+        return pd.Categorical.from_codes(lookup[codes], dtype=dtype)
+
+    def encode_features(self, features):
         """
-        Trains a new Linear Regression model on the provided dataset.
+        Builds the one-hot design matrix straight from the category codes as a CSR matrix:
+        every row holds exactly one 1.0 per feature, at the feature's offset plus its code.
         """
+        import scipy.sparse
+
+        offsets = np.cumsum([0] + [len(self.category_dtype(column).categories) for column in self.feature_columns])
+        indices = np.column_stack([features[column].cat.codes.to_numpy().astype(np.int32) + offset
+                                   for column, offset in zip(self.feature_columns, offsets)]).ravel()
+        indptr = np.arange(0, len(indices) + 1, len(self.feature_columns), dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.float64)
+        return scipy.sparse.csr_matrix((data, indices, indptr), shape=(len(features), offsets[-1]))
+
+    def _begin_training(self, data, progress):
+        """
+        Runs the first stage shared by full and incremental training, categorizing the feature
+        columns of data in place. Returns stage(name), which reports a stage to the progress
+        channel (if any) and checks for cancellation.
+        """
+        def stage(name):
+            if progress is not None:
+                progress.check_cancelled()
+                progress.report(name, rows=len(data))
+
+        stage("categorize")
+        with instrumentation.span("categorize", rows=len(data)):
+            for column in self.CATEGORICAL_MAPPINGS.keys():
+                data[column] = self.categorize_column(column, data[column])
+        return stage
+
+    def train_new_model(self, data, progress=None):
+        """
+        Trains a new linear model, selected by cross-validation, on the provided dataset.
+        With a progress channel, every stage is reported and cancellation is checked
+        between stages (raises TrainingCancelled before anything is saved).
+        """
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import mean_squared_error, r2_score
+
         print("🔄 Training a new model...")
 
         if data is None or data.empty:
@@ -75,22 +247,22 @@ class PredictionModel:
             return
 
         # Standardize categorical data
-        for column in self.CATEGORICAL_MAPPINGS.keys():
-            data[column] = data[column].apply(lambda x: self.categorize_feature(column, x))
+        stage = self._begin_training(data, progress)
 
-        self.features = data.iloc[:, :-1]  # All columns except the last one
-        self.target = data.iloc[:, -1]  # The last column (price)
+        # The categorized feature columns (all columns except the last one) and the price (the last column)
+        self.feature_columns = [column for column in data.columns[:-1] if column in self.CATEGORICAL_MAPPINGS]
+        self.features = data[self.feature_columns]
+        self.target = data.iloc[:, -1]
 
         if self.features.empty:
             print("❌ Error: No valid features after preprocessing!")
             return
 
-        # Encode categorical features using OneHotEncoder
-        categorical_features = [col for col in self.features.columns if self.features[col].dtype == 'object']
-        self.encoder = ColumnTransformer([("encoder", OneHotEncoder(handle_unknown='ignore'), categorical_features)],
-                                         remainder='passthrough')
-
-        X_transformed = self.encoder.fit_transform(self.features)
+        # One-hot encode the category codes into a sparse design matrix
+        stage("encode")
+        with instrumentation.span("encode", rows=len(self.features)) as encode:
+            X_transformed = self.encode_features(self.features)
+            encode.set(columns=X_transformed.shape[1], bytes=X_transformed.data.nbytes + X_transformed.indices.nbytes)
 
         # Split data into training and test sets
         X_train, X_test, y_train, y_test = train_test_split(X_transformed, self.target, test_size=0.2, random_state=42)
@@ -99,69 +271,416 @@ class PredictionModel:
             print("❌ Error: Training data is empty!")
             return
 
-        # Train the Linear Regression model
-        self.model = LinearRegression().fit(X_train, y_train)
+        # Cross-validate the candidate estimators on the encoded training rows and keep the best
+        stage("select")
+        with instrumentation.span("select", rows=X_train.shape[0]) as select:
+            self.estimator_name, estimator, scores = select_model(X_train, y_train, folds=self.SELECTION_FOLDS,
+                                                                  n_jobs=self.SELECTION_JOBS)
+            select.set(estimator=self.estimator_name)
+        for name, score in sorted(scores.items(), key=lambda item: item[1]):
+            print(f"🔎 {name}: CV MSE {score:.2f}")
+
+        # Train the selected model
+        stage("fit")
+        with instrumentation.span("fit", rows=X_train.shape[0], estimator=self.estimator_name):
+            self.model = estimator.fit(X_train, y_train)
 
         # Evaluate model performance
-        y_pred = self.model.predict(X_test)
-        mse = mean_squared_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
+        stage("evaluate")
+        with instrumentation.span("evaluate", rows=X_test.shape[0]) as evaluate:
+            y_pred = self.model.predict(X_test)
+            mse = mean_squared_error(y_test, y_pred)
+            r2 = r2_score(y_test, y_pred)
+            evaluate.set(mse=mse, r2=r2)
+
+        print(f"📊 Model trained successfully ({self.estimator_name})! MSE: {mse:.2f}, R²: {r2:.2f}")
+
+        # The held-out rows have done their job: refit on every row, so the saved model and its
+        # statistics cover all listings and a later incremental update equals a full refit
+        stage("refit")
+        with instrumentation.span("refit", rows=X_transformed.shape[0], estimator=self.estimator_name):
+            self.model = estimator.fit(X_transformed, self.target)
+
+        stage("save")
+        self.compile_lookup_tables()
+        self.build_price_cube()
+        self.statistics = SufficientStatistics(self.feature_columns, getattr(self.model, "alpha", 0.0))
+        self.statistics.update(self.features, self.target)
+        # Every listing (test rows included) can be shown as a comparable
+        self.listing_index = ListingIndex.from_frame(self.features, self.target)
+        return self.save_model()
+
+    def train_incremental(self, data, statistics, progress=None, base_index=None):
+        """
+        Updates a model without refitting: the new rows are folded into the sufficient
+        statistics of the previous model and the normal equations are re-solved, in time
+        independent of how much history the statistics already cover.
+        The new listings are appended to base_index (if given) for comparable listings.
+        """
+        print("🔄 Updating the model with new data...")
+
+        if data is None or data.empty:
+            print("❌ Error: No data available for training!")
+            return
+
+        stage = self._begin_training(data, progress)
+
+        stage("fit")
+        self.feature_columns = statistics.feature_columns
+        with instrumentation.span("fit", rows=len(data), estimator="incremental"):
+            statistics.update(data[self.feature_columns], data.iloc[:, -1])
+            if statistics.rows == 0:
+                print("❌ Error: Training data is empty!")
+                return
+            self.statistics = statistics
+            self.estimator_name = f"ridge(alpha={statistics.alpha:g})" if statistics.alpha else "linear"
+            self.lookup_tables, self.intercept = statistics.solve()
+
+        print(f"📊 Model updated successfully with {len(data)} rows ({statistics.rows} in total)!")
+
+        stage("save")
+        self.build_price_cube()
+        new_listings = ListingIndex.from_frame(data[self.feature_columns], data.iloc[:, -1])
+        self.listing_index = base_index.extend(new_listings) if base_index is not None else new_listings
+        return self.save_model()
+
+    def compile_lookup_tables(self):
+        """
+        Compiles the fitted linear model into one category -> contribution table per feature
+        plus the intercept, so a configuration is scored with a few lookups.
+        Unknown categories contribute 0, like handle_unknown='ignore'.
+        Legacy models with non-categorical (passthrough) features keep using the sklearn path.
+        """
+        self.lookup_tables = None
+        self.intercept = None
+        if self.model is None or self.features is None:
+            return
+        self.feature_columns = list(self.features.columns)  # Also missing in models pickled by older versions
+
+        if self.encoder is None:
+            encoded_columns = self.feature_columns
+            vocabularies = [self.category_dtype(column).categories for column in encoded_columns]
+        else:
+            encoded_columns = list(self.encoder.transformers_[0][2])
+            vocabularies = self.encoder.named_transformers_["encoder"].categories_
+            if sorted(encoded_columns) != sorted(self.feature_columns):
+                return
 
-        print(f"📊 Model trained successfully! MSE: {mse:.2f}, R²: {r2:.2f}")
+        coefficients = np.ravel(self.model.coef_)
+        tables, offset = {}, 0
+        for column, categories in zip(encoded_columns, vocabularies):
+            tables[column] = {category: float(coefficients[offset + i]) for i, category in enumerate(categories)}
+            offset += len(categories)
 
-        self.save_model()
+        self.lookup_tables = tables
+        self.intercept = float(np.ravel(self.model.intercept_)[0])
 
-    def save_model(self):
+    def build_price_cube(self):
         """
-        Saves the trained model to a file using pickle.
+        Materializes the price of every GUI-selectable configuration from the lookup tables.
         """
-        if not hasattr(self, "features") or self.features.empty:
-            print("❌ Error: The model has no valid features and cannot be saved!")
+        self.price_cube = None
+        if self.lookup_tables is None or sorted(self.INPUT_OPTIONS) != sorted(self.feature_columns):
             return
+        contributions = {column: [self.lookup_tables[column].get(self.categorize_feature(column, option), 0.0)
+                                  for option in options]
+                         for column, options in self.INPUT_OPTIONS.items()}
+        self.price_cube = PriceCube(self.INPUT_OPTIONS, contributions, self.intercept)
+
+    def query_configurations(self, max_price=None, min_price=None, constraints=None, limit=None, descending=False):
+        """
+        Lists GUI-selectable configurations within a price range that satisfy the constraints
+        (dict of feature -> allowed options), sorted by price. See PriceCube.query.
+        """
+        if self.price_cube is None:
+            raise ValueError("❌ Error: No trained model loaded!")
+        return self.price_cube.query(max_price, min_price, constraints, limit, descending)
+
+    def cheapest_upgrade(self, configuration, constraints):
+        """
+        Finds the cheapest change of a configuration that satisfies the constraints.
+        See PriceCube.cheapest_upgrade.
+        """
+        if self.price_cube is None:
+            raise ValueError("❌ Error: No trained model loaded!")
+        return self.price_cube.cheapest_upgrade(configuration, constraints)
+
+    def score_configuration(self, configuration):
+        """
+        Scores one configuration (a dict keyed by feature name, or a tuple in feature
+        column order) with the compiled lookup tables.
+        """
+        columns = self.feature_columns
+        if isinstance(configuration, dict):
+            values = [configuration[column] for column in columns]
+        else:
+            if len(configuration) != len(columns):
+                raise ValueError(f"❌ Error: Expected {len(columns)} values ({', '.join(columns)})!")
+            values = configuration
+
+        price = self.intercept
+        for column, value in zip(columns, values):
+            price += self.lookup_tables[column].get(self.categorize_feature(column, value), 0.0)
+        return price
+
+    def has_listing_index(self):
+        """
+        Returns True if the model has comparable listings (loaded or still in their file).
+        """
+        return self.listing_index is not None or self.listing_index_file is not None
+
+    def get_listing_index(self):
+        """
+        Returns the listing index, reading it from its file on first use (it grows with the
+        dataset, so loading a model does not read it). Returns None if it is unavailable.
+        """
+        if self.listing_index is None and self.listing_index_file is not None:
+            path, token = self.listing_index_file
+            with instrumentation.span("load_listings", path=path):
+                self.listing_index = ListingIndex.load(path, token)
+            self.listing_index_file = None
+            if self.listing_index is None:
+                print(f"❌ Error: The listing index {path} is missing or belongs to another model!")
+        return self.listing_index
+
+    def similar_listings(self, configuration, k=5):
+        """
+        Returns the k stored listings most similar to a configuration (a dict keyed by feature
+        name), best first: dicts of their categories, price and number of matching features.
+        Ties are broken by how close the listing's price is to the configuration's estimate.
+        Features are categorized exactly as for the estimate (see categorize_string), so an option
+        that maps to "Other" (e.g. "Intel Integrated") matches the listings in "Other".
+        """
+        listing_index = self.get_listing_index()
+        if listing_index is None:
+            raise ValueError("❌ Error: The model has no listing index – train it again!")
+        given = [column for column in self.feature_columns if configuration.get(column) is not None]
+        categorized = {column: self.categorize_feature(column, configuration[column]) for column in given}
+        estimate = self.score_configuration(configuration) if len(given) == len(self.feature_columns) else None
+        with instrumentation.span("similar", k=k, listings=listing_index.size):
+            return listing_index.nearest(categorized, k, estimate)
+
+    def train_from_store(self, store, start=None, end=None):
+        """
+        Trains a new model on listings accumulated in a DatasetStore, reading only
+        the feature and price columns of the requested date range (a model registered
+        for exactly these listings is reused).
+        """
+        data = store.read(columns=list(self.CATEGORICAL_MAPPINGS.keys()) + ["price"], start=start, end=end)
+        self.train_or_reuse(data, reuse=True)
+
+    def is_trained(self):
+        """
+        Returns True if the model can make predictions.
+        """
+        return self.lookup_tables is not None or self.model is not None
+
+    def save_model(self, path=MODEL_FILENAME):
+        """
+        Saves the trained model as a slim .npz artifact (lookup tables and intercept only,
+        no pickled objects and no training data); the listing index, which grows with the
+        dataset, is written next to it (listings_path). Returns True on success.
+        """
+        if self.lookup_tables is None:
+            print("❌ Error: The model has no compiled lookup tables and cannot be saved!")
+            return False
 
         try:
-            with open(MODEL_FILENAME, "wb") as file:
-                pickle.dump(self, file)
-            print(f"✅ Model saved to {MODEL_FILENAME}")
+            if self.statistics is not None:
+                metadata = {"trained_rows": self.statistics.rows}
+            else:
+                metadata = {"trained_rows": 0 if self.features is None else len(self.features)}
+            metadata["estimator"] = self.estimator_name
+            extra_arrays = self.statistics.to_arrays() if self.statistics is not None else {}
+            listing_index = self.get_listing_index()
+            with instrumentation.span("save") as save:
+                # The listing index goes to its own file first, tied to this artifact by a token
+                if listing_index is not None:
+                    metadata["listings"] = uuid.uuid4().hex
+                    listing_index.save(listings_path(path), metadata["listings"])
+                elif os.path.exists(listings_path(path)):
+                    os.remove(listings_path(path))
+                write_artifact(path, self.feature_columns, self.lookup_tables, self.intercept, metadata, extra_arrays)
+                save.set(bytes=os.path.getsize(path))
+            print(f"✅ Model saved to {path}")
+            return True
         except Exception as e:
             print(f"❌ Error saving model: {e}")
+            return False
 
     @staticmethod
-    def load_model():
+    def load_model(path=MODEL_FILENAME):
         """
-        Loads a previously saved model from a file.
+        Loads a previously saved model from its artifact.
+        Returns the model state (attribute dict) or None if no valid model could be loaded;
+        an invalid file is reported and left in place, never deleted.
         """
+        if path == MODEL_FILENAME and not os.path.exists(path) and os.path.exists(LEGACY_MODEL_FILENAME):
+            return PredictionModel.migrate_legacy_model()
+
         try:
-            with open(MODEL_FILENAME, "rb") as file:
+            with instrumentation.span("load", bytes=os.path.getsize(path)):
+                header, lookup_tables, intercept, extra_arrays = read_artifact(path)
+            if not header["feature_columns"]:
+                print("❌ Error: Model lacks valid features!")
+                return None
+
+            print(f"✅ Model loaded successfully!")
+            token = header["metadata"].get("listings")
+            return {"feature_columns": header["feature_columns"], "lookup_tables": lookup_tables,
+                    "intercept": intercept, "estimator_name": header["metadata"].get("estimator"),
+                    "statistics": SufficientStatistics.from_arrays(header["feature_columns"], extra_arrays),
+                    "listing_index": None, "listing_index_file": (listings_path(path), token) if token else None}
+        except Exception as e:
+            print(f"❌ Error loading model: {e}")
+            return None
+
+    @staticmethod
+    def migrate_legacy_model():
+        """
+        Loads a model pickled by an older version, compiles its lookup tables and
+        saves it in the slim artifact format. The pickle file is left untouched.
+        """
+        try:
+            with open(LEGACY_MODEL_FILENAME, "rb") as file:
                 loaded_model = pickle.load(file)
 
             if not hasattr(loaded_model, "features") or loaded_model.features.empty:
-                print("❌ Error: Model lacks valid features! Deleting file.")
-                os.remove(MODEL_FILENAME)
+                print("❌ Error: Model lacks valid features!")
                 return None
 
-            print(f"✅ Model loaded successfully!")
-            return loaded_model
+            # Attributes added since the model was pickled start out unset, as in __init__
+            for attribute in ("feature_columns", "lookup_tables", "intercept", "price_cube", "statistics",
+                              "estimator_name", "dataset_key", "listing_index", "listing_index_file"):
+                if not hasattr(loaded_model, attribute):
+                    setattr(loaded_model, attribute, None)
+
+            loaded_model.compile_lookup_tables()
+            if loaded_model.lookup_tables is not None and loaded_model.save_model():
+                print(f"✅ Migrated {LEGACY_MODEL_FILENAME} to {MODEL_FILENAME}")
+            else:
+                print(f"⚠️ Could not migrate {LEGACY_MODEL_FILENAME} – it is loaded from the pickle again next time.")
+            return loaded_model.__dict__
         except Exception as e:
             print(f"❌ Error loading model: {e}")
             return None
 
     def predict(self, input_df):
         """
-        Predicts the price based on input data.
+        Predicts the price based on input data: a DataFrame, a single configuration
+        (dict or tuple in feature column order) or a list of configurations.
+        Configurations are scored with the compiled lookup tables when available.
         """
-        if self.model is None:
+        if not self.is_trained():
             raise ValueError("❌ Error: No trained model loaded!")
 
+        if isinstance(input_df, (dict, tuple, list)):
+            configurations = [input_df] if isinstance(input_df, (dict, tuple)) else input_df
+            if self.lookup_tables is not None:
+                with instrumentation.span("predict", rows=len(configurations)):
+                    prediction = np.array([self.score_configuration(config) for config in configurations])
+                return np.maximum(prediction, 0)  # Ensure non-negative prices
+
+            # Fall back to the sklearn pipeline
+            import pandas as pd
+            columns = self.feature_columns
+            input_df = pd.DataFrame([config if isinstance(config, dict) else dict(zip(columns, config))
+                                     for config in configurations])[columns]
+        elif self.lookup_tables is not None:
+            return self.predict_frame(input_df)
+
         # Ensure input data matches expected categories
         for column in self.CATEGORICAL_MAPPINGS.keys():
-            input_df[column] = input_df[column].apply(lambda x: self.categorize_feature(column, x))
+            input_df[column] = self.categorize_column(column, input_df[column])
 
         if self.encoder is None:
             raise ValueError("❌ Error: Encoder is missing! Train the model first.")
 
-        input_transformed = self.encoder.transform(input_df)
-
         # Perform prediction and ensure the price is not negative
-        prediction = self.model.predict(input_transformed)
+        with instrumentation.span("predict", rows=len(input_df)):
+            prediction = self.model.predict(self.encoder.transform(input_df))
         return np.maximum(prediction, 0)  # Ensure non-negative prices
+
+    def predict_frame(self, frame):
+        """
+        Vectorized prediction for a DataFrame of raw or standardized configurations.
+        Each distinct value of a column is categorized and looked up once, then the
+        contributions are broadcast to the rows through the factorized codes
+        (columns already carrying the fixed category dtype are indexed by their codes directly).
+        """
+        if self.lookup_tables is None:
+            return self.predict(frame.copy())
+
+        with instrumentation.span("predict", rows=len(frame)):
+            return self.score_frame(frame)
+
+    def score_frame(self, frame):
+        """
+        Sums the lookup-table contributions of every row of a frame (see predict_frame).
+        """
+        import pandas as pd
+
+        prices = np.full(len(frame), self.intercept, dtype=np.float64)
+        for column in self.feature_columns:
+            table = self.lookup_tables[column]
+            values = frame[column]
+            if isinstance(values.dtype, pd.CategoricalDtype) and values.dtype == self.category_dtype(column):
+                # Already categorized: look up the fixed vocabulary once and index it by the codes
+                contributions = [table.get(category, 0.0) for category in values.dtype.categories]
+                prices += np.array(contributions)[values.cat.codes.to_numpy()]
+                continue
+            codes, uniques = pd.factorize(values)
+            contributions = [table.get(self.categorize_feature(column, value), 0.0) for value in uniques]
+            contributions.append(table.get("Other", 0.0))  # Missing values have code -1
+            prices += np.array(contributions)[codes]
+        return np.maximum(prices, 0)  # Ensure non-negative prices
+
+    @staticmethod
+    def read_chunks(path, columns, chunk_size=BATCH_CHUNK_SIZE):
+        """
+        Reads a CSV or Parquet file in chunks of at most chunk_size rows.
+        Feature columns of CSV files are read as strings.
+        """
+        import pandas as pd
+
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            parquet_file = pq.ParquetFile(path, memory_map=True)
+            for batch in parquet_file.iter_batches(batch_size=chunk_size):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(path, chunksize=chunk_size, dtype={column: str for column in columns})
+
+    def predict_file(self, input_path, output_path, chunk_size=BATCH_CHUNK_SIZE):
+        """
+        Prices every configuration of a CSV or Parquet file without loading it whole:
+        each chunk is predicted with one vectorized call and appended to the output
+        (CSV or Parquet, by extension) with an extra predicted_price column.
+        Returns the number of rows written.
+        """
+        if not self.is_trained():
+            raise ValueError("❌ Error: No trained model loaded!")
+
+        columns = self.feature_columns
+        rows, writer = 0, None
+        try:
+            for chunk in self.read_chunks(input_path, columns, chunk_size):
+                missing_cols = set(columns) - set(chunk.columns)
+                if missing_cols:
+                    raise ValueError(f"❌ Error: Missing columns in {input_path}: {missing_cols}")
+
+                chunk[PREDICTION_COLUMN] = self.predict_frame(chunk)
+                if output_path.endswith(".parquet"):
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    table = pa.Table.from_pandas(chunk, preserve_index=False,
+                                                 schema=writer.schema if writer else None)
+                    writer = writer or pq.ParquetWriter(output_path, table.schema)
+                    writer.write_table(table)
+                else:
+                    chunk.to_csv(output_path, mode="w" if rows == 0 else "a", header=rows == 0, index=False)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
@@ -0,0 +1,63 @@
+import json
+import os
+import time
+import numpy as np
+
+# Version of the artifact layout; bump on incompatible changes
+ARTIFACT_VERSION = 1
+
+
+def write_artifact(path, feature_columns, lookup_tables, intercept, metadata=None, extra_arrays=None):
+    """
+    Writes a trained model as a slim, pickle-free .npz artifact:
+    a JSON header (schema version, feature columns, metadata), the category vocabulary
+    and coefficient array of every feature, the intercept and optional extra arrays
+    (e.g. sufficient statistics for incremental training).
+    The file is written to a temporary name first and renamed, so readers never see a partial file.
+    """
+    header = {
+        "schema_version": ARTIFACT_VERSION,
+        "feature_columns": list(feature_columns),
+        "target": "price",
+        "created": time.time(),
+        "metadata": metadata or {},
+    }
+    arrays = dict(extra_arrays or {})
+    arrays.update(header=np.array(json.dumps(header)), intercept=np.array([intercept], dtype=np.float64))
+    for i, column in enumerate(feature_columns):
+        table = lookup_tables[column]
+        arrays[f"vocab_{i}"] = np.array(list(table.keys()), dtype=str)
+        arrays[f"coef_{i}"] = np.array(list(table.values()), dtype=np.float64)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        np.savez(file, **arrays)  # Uncompressed, arrays are read directly from the archive
+    os.replace(tmp_path, path)
+
+
+def listings_path(path):
+    """
+    Path of the listing index kept next to an artifact (model.npz -> model.listings.npz).
+    """
+    return os.path.splitext(path)[0] + ".listings.npz"
+
+
+def read_artifact(path):
+    """
+    Reads an artifact written by write_artifact without unpickling anything.
+    Returns (header, lookup_tables, intercept, extra_arrays).
+    """
+    with np.load(path, allow_pickle=False) as arrays:
+        header = json.loads(str(arrays["header"]))
+        if header.get("schema_version", 0) > ARTIFACT_VERSION:
+            raise ValueError(f"Artifact version {header.get('schema_version')} is newer than "
+                             f"supported version {ARTIFACT_VERSION}")
+
+        lookup_tables = {}
+        for i, column in enumerate(header["feature_columns"]):
+            lookup_tables[column] = dict(zip(arrays[f"vocab_{i}"].tolist(), arrays[f"coef_{i}"].tolist()))
+        intercept = float(arrays["intercept"][0])
+        core = {"header", "intercept"} | {f"{kind}_{i}" for kind in ("vocab", "coef")
+                                          for i in range(len(header["feature_columns"]))}
+        extra_arrays = {name: arrays[name] for name in arrays.files if name not in core}
+    return header, lookup_tables, intercept, extra_arrays
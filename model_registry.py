@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from model_artifact import listings_path
+
+REGISTRY_DIR = "models"
+INDEX_FILENAME = "registry.json"
+DEFAULT_MAX_ENTRIES = 5  # Model versions kept; the least recently used ones are evicted
+
+
+def replace_atomically(source, destination):
+    """
+    Copies a file next to its destination and renames it into place, so readers
+    (the GUI, the prediction server) never see a partially written model.
+    """
+    directory = os.path.dirname(os.path.abspath(destination))
+    tmp_path = os.path.join(directory, f".{os.path.basename(destination)}.{uuid.uuid4().hex}.tmp")
+    try:
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def replace_model(source, destination):
+    """
+    Replaces a model artifact and the listing index next to it (see listings_path); a destination
+    index without a source one is removed. Indexes are matched to their artifact by a token,
+    so a reader never pairs an artifact with another model's listings.
+    """
+    if os.path.exists(listings_path(source)):
+        replace_atomically(listings_path(source), listings_path(destination))
+    elif os.path.exists(listings_path(destination)):
+        os.remove(listings_path(destination))
+    replace_atomically(source, destination)
+
+
+class ModelRegistry:
+    """
+    Content-addressed store of trained model artifacts.
+
+    Every entry is keyed by a hash of the training dataset and the code/schema version that
+    trained it, so training on data that was seen before can be skipped and the cached model
+    reused. The active model is copied to the model file the rest of the application reads
+    (model.npz); activating an older entry is an instant rollback. At most max_entries are kept,
+    evicting the least recently used one (never the active one).
+    """
+
+    def __init__(self, directory=REGISTRY_DIR, active_path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        from model import MODEL_FILENAME
+
+        self.directory = directory
+        self.active_path = active_path or MODEL_FILENAME
+        self.max_entries = max(1, max_entries)
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        os.makedirs(directory, exist_ok=True)
+        self.index = self.read_index()
+
+    @staticmethod
+    def dataset_key(frame, version, extra=b""):
+        """
+        Hashes a training dataset (column names, values and row order) together with
+        the code/schema version into a registry key.
+        """
+        import pandas as pd
+
+        digest = hashlib.sha256(str(version).encode("utf-8"))
+        digest.update("\x1f".join(map(str, frame.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+        digest.update(extra)
+        return digest.hexdigest()[:32]
+
+    def read_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {"active": None, "history": [], "entries": {}}
+
+    def write_index(self):
+        tmp_path = f"{self.index_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.index, file, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def has(self, key):
+        return key in self.index["entries"] and os.path.exists(self.entry_path(key))
+
+    def entries(self):
+        """
+        Returns the entries as dicts (newest first), marking the active one.
+        """
+        entries = [dict(entry, key=key, active=key == self.index["active"])
+                   for key, entry in self.index["entries"].items()]
+        return sorted(entries, key=lambda entry: entry["created"], reverse=True)
+
+    def active_entry(self):
+        """
+        Returns the metadata of the active entry, or None.
+        """
+        return self.index["entries"].get(self.index["active"]) if self.index["active"] else None
+
+    def annotate(self, key, **metadata):
+        """
+        Adds metadata to an entry, e.g. the dataset parts its model was trained on.
+        """
+        if key in self.index["entries"]:
+            self.index["entries"][key].update(metadata)
+            self.write_index()
+
+    def add(self, key, artifact_path, metadata=None):
+        """
+        Copies a saved model artifact into the registry under key and makes it the active model.
+        """
+        replace_model(artifact_path, self.entry_path(key))
+        now = time.time()
+        self.index["entries"][key] = {"created": now, "last_used": now, **(metadata or {})}
+        self.activate(key)
+        self.evict()
+
+    def activate(self, key, record=True):
+        """
+        Makes an entry the active model (copied atomically to the active model file) and,
+        if record is set, pushes it onto the activation history used by rollback.
+        """
+        if not self.has(key):
+            raise ValueError(f"❌ Error: Model {key} is not in the registry!")
+        if os.path.abspath(self.entry_path(key)) != os.path.abspath(self.active_path):
+            replace_model(self.entry_path(key), self.active_path)
+        self.index["entries"][key]["last_used"] = time.time()
+        if record:
+            self.index["history"] = [entry for entry in self.index["history"] if entry != key] + [key]
+        self.index["active"] = key
+        self.write_index()
+        return key
+
+    def rollback(self):
+        """
+        Re-activates the previously active model that is still in the registry.
+        Returns its key, or None if there is nothing to roll back to.
+        """
+        history = [key for key in self.index["history"] if self.has(key)]
+        if len(history) < 2:
+            return None
+        history.pop()  # The current model; repeated rollbacks walk further back
+        self.index["history"] = history
+        return self.activate(history[-1], record=False)
+
+    def load(self, key):
+        """
+        Loads the model state of an entry (see PredictionModel.load_model) and activates it,
+        or returns None if the entry is missing or unreadable (the entry is left in place).
+        """
+        from model import PredictionModel
+
+        if not self.has(key):
+            return None
+        state = PredictionModel.load_model(self.entry_path(key))
+        if state is None:
+            return None
+        self.activate(key)
+        return state
+
+    def evict(self):
+        """
+        Removes the least recently used entries beyond max_entries (never the active one).
+        """
+        entries = self.index["entries"]
+        candidates = sorted((key for key in entries if key != self.index["active"]),
+                            key=lambda key: entries[key]["last_used"])
+        while len(entries) > self.max_entries and candidates:
+            key = candidates.pop(0)
+            del entries[key]
+            for path in (self.entry_path(key), listings_path(self.entry_path(key))):
+                if os.path.exists(path):
+                    os.remove(path)
+            print(f"🗑️ Evicted model {key} from the registry.")
+        self.index["history"] = [key for key in self.index["history"] if key in entries]
+        self.write_index()
@@ -0,0 +1,66 @@
+import numpy as np
+
+# Linear candidates only, so every winner still compiles into per-feature lookup tables
+DEFAULT_ALPHAS = (0.1, 1.0, 10.0, 100.0)
+DEFAULT_FOLDS = 5
+
+
+def default_candidates(alphas=DEFAULT_ALPHAS):
+    """
+    Returns the candidate estimators as (name, estimator) pairs: ordinary least squares
+    and Ridge at several regularization strengths.
+    """
+    from sklearn.linear_model import LinearRegression, Ridge
+
+    candidates = [("linear", LinearRegression())]
+    # A tight tolerance makes the iterative sparse solvers agree with the exact normal equations
+    # solved by SufficientStatistics for later incremental updates
+    candidates += [(f"ridge(alpha={alpha:g})", Ridge(alpha=alpha, tol=1e-8)) for alpha in alphas]
+    return candidates
+
+
+def fit_and_score(estimator, X, y, train_index, test_index):
+    """
+    Fits a fresh clone of an estimator on one fold and returns its mean squared error on
+    the held-out rows. Runs in the worker processes, where X is a read-only memmap.
+    """
+    from sklearn.base import clone
+
+    model = clone(estimator).fit(X[train_index], y[train_index])
+    residuals = model.predict(X[test_index]) - y[test_index]
+    return float(np.mean(residuals ** 2))
+
+
+def select_model(X, y, candidates=None, folds=DEFAULT_FOLDS, n_jobs=-1, random_state=42):
+    """
+    Evaluates every candidate with k-fold cross-validation on an already encoded design matrix
+    and returns (name, estimator, scores), where scores maps each name to its mean CV error.
+
+    All (candidate, fold) fits run in parallel in a joblib process pool. The sparse matrix is
+    encoded once by the caller; joblib dumps its arrays to a memmap once and every worker maps
+    the same read-only file instead of receiving its own pickled copy.
+    """
+    import scipy.sparse
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    candidates = candidates or default_candidates()
+    X = scipy.sparse.csr_matrix(X)
+    y = np.asarray(y, dtype=np.float64)
+    folds = min(folds, len(y))
+    if folds < 2:
+        name, estimator = candidates[0]
+        return name, estimator, {}
+
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=random_state).split(y))
+    tasks = [(name, estimator, train_index, test_index)
+             for name, estimator in candidates for train_index, test_index in splits]
+
+    errors = Parallel(n_jobs=n_jobs, backend="loky", max_nbytes="1M", mmap_mode="r")(
+        delayed(fit_and_score)(estimator, X, y, train_index, test_index)
+        for _, estimator, train_index, test_index in tasks)
+
+    scores = {name: float(np.mean([error for (task_name, *_), error in zip(tasks, errors) if task_name == name]))
+              for name, _ in candidates}
+    name, estimator = min(candidates, key=lambda candidate: scores[candidate[0]])
+    return name, estimator, scores
@@ -0,0 +1,242 @@
+import collections
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+import instrumentation
+from listing_parser import COLUMNS, PARSER_VERSION, timed_parse
+
+DEFAULT_QUEUE_DEPTH = 16  # Pages held at most per stage (downloaded but not parsed / parsing)
+DEFAULT_CHUNK_ROWS = 8192  # Rows collected before they flow on as one DataFrame (a frame per page is slow)
+
+
+def listing_frame(rows):
+    """
+    Builds the DataFrame of one page's rows, with the raw fields as categoricals.
+    """
+    frame = pd.DataFrame.from_records(rows, columns=COLUMNS)
+    return frame.astype({column: "category" for column in COLUMNS[:-1]})
+
+
+def categorize_frame(frame):
+    """
+    Normalizes raw listing fields with the model's category mappings (fixed-vocabulary categoricals).
+    """
+    from model import PredictionModel
+
+    model = PredictionModel.__new__(PredictionModel)  # Only the mappings are needed, not a trained model
+    return frame.assign(**{column: model.categorize_column(column, frame[column])
+                           for column in PredictionModel.CATEGORICAL_MAPPINGS if column in frame})
+
+
+class DataFrameSink:
+    """
+    Collects the streamed chunk frames into one DataFrame, keeping the columns categorical.
+    """
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+    def close(self):
+        if not self.frames:
+            return listing_frame([])
+        columns = {}
+        for column in self.frames[0].columns:
+            if isinstance(self.frames[0][column].dtype, pd.CategoricalDtype):
+                # Pages have different raw categories; union them instead of falling back to object
+                columns[column] = pd.api.types.union_categoricals([frame[column] for frame in self.frames])
+            else:
+                columns[column] = pd.concat([frame[column] for frame in self.frames], ignore_index=True)
+        self.frames = []
+        return pd.DataFrame(columns)
+
+
+class ParquetSink:
+    """
+    Streams the chunk frames into a Parquet file (one row group per chunk); returns the row count.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+        self.rows = 0
+
+    def write(self, frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Categorical columns are written as plain strings (every chunk has its own categories),
+        # converted by Arrow so missing fields stay null instead of becoming the string "nan"
+        schema = pa.schema([pa.field(column, pa.string()) if isinstance(frame[column].dtype, pd.CategoricalDtype)
+                            else pa.Schema.from_pandas(frame[[column]], preserve_index=False).field(column)
+                            for column in frame.columns])
+        table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+        self.rows += len(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        return self.rows
+
+
+class ListingPipeline:
+    """
+    Streaming scraper: fetch → parse → normalize → sink.
+
+    Pages are downloaded by the Data object's thread pool and parsed as soon as each arrives;
+    with parse_workers > 1 they are handed to a process pool, so parsing uses every core
+    instead of one GIL-bound thread.
+    Both stages hold at most queue_depth pages, and parsed rows flow on in DataFrames of
+    about chunk_rows rows, so peak memory is bounded by the queue depth and chunk size rather
+    than the number of pages. Rows leave the pipeline in page order.
+    """
+
+    def __init__(self, data, parse_workers=None, queue_depth=DEFAULT_QUEUE_DEPTH, normalize=False, progress=None,
+                 chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        :param data: Data object used for fetching (session, retries, HTTP cache).
+        :param parse_workers: Parser processes; by default (or 1) pages are parsed in this process.
+                              More than 1 starts a process pool, which requires the main script
+                              to be guarded by if __name__ == "__main__".
+        :param queue_depth: Maximum number of pages waiting in each stage.
+        :param normalize: Map the raw fields to the model categories (categorize_frame).
+        :param progress: Optional ProgressChannel; receives a "fetch" message per page and is
+                         checked for cancellation between pages (raises TrainingCancelled).
+        :param chunk_rows: Rows per DataFrame handed to the sink.
+        """
+        self.data = data
+        self.parse_workers = parse_workers or 1
+        self.queue_depth = max(1, queue_depth)
+        self.normalize = normalize
+        self.progress = progress
+        self.chunk_rows = max(1, chunk_rows)
+
+    @staticmethod
+    def completed(rows):
+        future = Future()
+        future.set_result(rows)
+        return future
+
+    def submit_parse(self, pool, content, digest):
+        """
+        Returns (future of (rows, parse seconds or None), cache key to store them under or None):
+        cached rows, an inline parse (timed by its own span) or a parser process task.
+        """
+        if pool is None:
+            return self.completed((self.data.parse_page(content, digest), None)), None
+
+        key = f"{digest}-v{PARSER_VERSION}" if self.data.cache is not None and digest is not None else None
+        if key is not None:
+            start = time.perf_counter()
+            rows = self.data.cache.get_rows(key)
+            if rows is not None:
+                instrumentation.record("parse", time.perf_counter() - start, bytes=len(content), cached=True,
+                                       rows=len(rows))
+                return self.completed((rows, None)), None
+        return pool.submit(timed_parse, content, self.data.parser_backend), key
+
+    def create_parse_pool(self):
+        """
+        Starts the parser processes from a fork server (spawn where unavailable): the pool is
+        created while fetch threads (and the Tk thread) are running, and forking a threaded
+        process can leave a child with locks that are never released.
+        """
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            # Import the parser (and the main module) once in the server instead of in every child
+            context.set_forkserver_preload(["__main__", "listing_parser"])
+        else:
+            context = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=context)
+
+    def parsed_pages(self, page_numbers):
+        """
+        Yields (page_number, rows) in page order while later pages are still being
+        downloaded and parsed. Failed downloads yield no rows.
+        """
+        page_numbers = iter(page_numbers)
+        fetches = collections.deque()  # (page, future of (content, digest)) in page order
+        parses = collections.deque()  # (page, future of (rows, seconds), cache key, bytes) in page order
+
+        fetch_pool = ThreadPoolExecutor(max_workers=self.data.max_workers)
+        parse_pool = self.create_parse_pool() if self.parse_workers > 1 else None
+        try:
+            while True:
+                # Keep the download queue full
+                while len(fetches) < self.queue_depth:
+                    page = next(page_numbers, None)
+                    if page is None:
+                        break
+                    fetches.append((page, fetch_pool.submit(self.data.fetch_page, page)))
+
+                # Hand downloaded pages to the parsers, in order, while there is room
+                while fetches and len(parses) < self.queue_depth and (fetches[0][1].done() or not parses):
+                    page, future = fetches.popleft()
+                    content, digest = future.result()
+                    if content is None:
+                        parses.append((page, self.completed(([], None)), None, 0))
+                        continue
+                    parses.append((page, *self.submit_parse(parse_pool, content, digest), len(content)))
+
+                if not parses:
+                    if not fetches:
+                        return
+                    continue
+                page, future, key, size = parses.popleft()
+                rows, seconds = future.result()
+                if seconds is not None:
+                    instrumentation.record("parse", seconds, bytes=size, rows=len(rows), process="worker")
+                if key is not None:
+                    self.data.cache.put_rows(key, rows)  # The cache is only touched from this thread
+                instrumentation.count("parsed_pages")
+                instrumentation.count("parsed_rows", len(rows))
+                yield page, rows
+        finally:
+            # If the consumer stops early (e.g. cancellation), drop the pages not started yet
+            fetch_pool.shutdown(wait=True, cancel_futures=True)
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=True, cancel_futures=True)
+
+    def chunk_frame(self, rows):
+        frame = listing_frame(rows)
+        return categorize_frame(frame) if self.normalize else frame
+
+    def frames(self, page_numbers=None):
+        """
+        Yields (optionally normalized) DataFrames of about chunk_rows rows each.
+        """
+        if page_numbers is None:
+            page_numbers = range(1, self.data.get_number_of_pages() + 1)
+        total, rows = len(page_numbers), 0
+        chunk = []
+        for done, (_, page_rows) in enumerate(self.parsed_pages(page_numbers), start=1):
+            if self.progress is not None:
+                self.progress.check_cancelled()
+            rows += len(page_rows)
+            chunk += page_rows
+            if len(chunk) >= self.chunk_rows:
+                yield self.chunk_frame(chunk)
+                chunk = []
+            if self.progress is not None:
+                self.progress.report("fetch", done, total, rows)
+        if chunk:
+            yield self.chunk_frame(chunk)
+
+        if self.data.cache is not None:
+            self.data.cache.flush()
+
+    def run(self, sink, page_numbers=None):
+        """
+        Streams every page into a sink (an object with write(frame) and close()) and
+        returns the sink's close() result, e.g. the DataFrame of a DataFrameSink.
+        """
+        for frame in self.frames(page_numbers):
+            sink.write(frame)
+        return sink.close()
@@ -0,0 +1,369 @@
+import asyncio
+import collections
+import json
+import os
+import time
+
+import numpy as np
+from model import MODEL_FILENAME, PredictionModel
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH_ROWS = 4096  # Rows priced by one vectorized call at most
+MAX_BATCH_WAIT = 0.002  # Seconds a batch waits for more requests after the first one arrives
+RELOAD_INTERVAL = 1.0  # Seconds between checks of the model artifact's modification time
+LATENCY_WINDOW = 10_000  # Latest request latencies kept for the percentiles
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_SIMILAR_LISTINGS = 100  # Most listings one /similar request may ask for
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class RequestError(Exception):
+    """
+    A request the server rejects, with the HTTP status to answer.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ServerMetrics:
+    """
+    Request latencies (a sliding window for the percentiles) and request/row counters.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time.perf_counter()
+        self.latencies = collections.deque(maxlen=window)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.reloads = 0
+
+    def record(self, seconds, rows):
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.rows += rows
+
+    def snapshot(self):
+        """
+        Returns the metrics as a JSON-serializable dict (latencies in milliseconds).
+        """
+        uptime = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1000
+        p50, p99 = np.percentile(latencies, [50, 99]).tolist() if len(latencies) else (None, None)
+        return {
+            "uptime_s": uptime, "requests": self.requests, "rows": self.rows, "errors": self.errors,
+            "batches": self.batches, "rows_per_batch": self.rows / self.batches if self.batches else None,
+            "reloads": self.reloads, "latency_p50_ms": p50, "latency_p99_ms": p99,
+            "requests_per_s": self.requests / uptime, "rows_per_s": self.rows / uptime,
+        }
+
+
+class PredictionServer:
+    """
+    Local HTTP/JSON prediction service around the saved model.
+
+    POST /predict takes one configuration ({"processor": ..., ...}) or a batch
+    ({"configurations": [...]}, or a JSON list). Concurrent requests are queued and
+    coalesced into one vectorized predict_frame call per batch window (MAX_BATCH_WAIT seconds
+    or MAX_BATCH_ROWS rows). The model is reloaded when its artifact changes on disk.
+    POST /similar ({"configuration": {...}, "k": 5}) returns the most similar stored listings.
+    GET /metrics reports p50/p99 latency and throughput, GET /health the model state.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch_rows=MAX_BATCH_ROWS,
+                 max_batch_wait=MAX_BATCH_WAIT, reload_interval=RELOAD_INTERVAL):
+        self.host = host
+        self.port = port
+        self.model_path = MODEL_FILENAME  # Written atomically by save_model, so a reload never sees a partial file
+        self.max_batch_rows = max_batch_rows
+        self.max_batch_wait = max_batch_wait
+        self.reload_interval = reload_interval
+        self.model = None
+        self.model_mtime = None
+        self.metrics = ServerMetrics()
+        self.queue = None  # asyncio.Queue of (configurations, future), created inside the event loop
+        self.server = None
+        self.tasks = []
+
+    # ---- Model loading -------------------------------------------------------------------
+
+    def artifact_mtime(self):
+        try:
+            return os.stat(self.model_path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def load_model():
+        """
+        Loads the saved model (runs on an executor thread; never touches a model in use).
+        """
+        model = PredictionModel(load_existing=True)
+        return model if model.is_trained() else None
+
+    @staticmethod
+    def prepare_listing_index(model):
+        """
+        Reads and groups a model's listing index (runs on an executor thread at the first /similar
+        request, so neither loading the model nor the event loop pays for it).
+        """
+        listing_index = model.get_listing_index()
+        if listing_index is not None and listing_index.size and listing_index.group_codes is None:
+            listing_index.build_groups()
+        return listing_index
+
+    async def reload_model(self):
+        """
+        Loads the artifact if it changed since the last load and swaps the new model in.
+        Requests already batched keep the model they started with.
+        """
+        mtime = self.artifact_mtime()
+        if mtime is None or mtime == self.model_mtime:
+            return
+        model = await asyncio.get_running_loop().run_in_executor(None, self.load_model)
+        self.model_mtime = mtime
+        if model is None:
+            print("❌ Error: The model artifact could not be loaded; keeping the current model.")
+            return
+        if self.model is not None:
+            self.metrics.reloads += 1
+            print("🔄 Model artifact changed – reloaded.")
+        self.model = model
+
+    async def watch_model(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await self.reload_model()
+
+    # ---- Micro-batching ------------------------------------------------------------------
+
+    def predict_batch(self, model, configurations):
+        """
+        Prices a list of configurations with one vectorized call.
+        """
+        import pandas as pd
+
+        columns = model.feature_columns
+        frame = pd.DataFrame([config if isinstance(config, dict) else dict(zip(columns, config))
+                              for config in configurations], columns=columns)
+        if model.lookup_tables is not None:
+            return model.predict_frame(frame)
+        return model.predict(frame)
+
+    async def batch_worker(self):
+        """
+        Collects queued requests into batches and answers every request from its slice.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.max_batch_wait
+            while rows < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            configurations = [config for request, _ in batch for config in request]
+            model = self.model
+            try:
+                prices = await loop.run_in_executor(None, self.predict_batch, model, configurations)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RequestError(400, f"Prediction failed: {e}"))
+                continue
+
+            self.metrics.batches += 1
+            offset = 0
+            for request, future in batch:
+                if not future.done():
+                    future.set_result(np.asarray(prices[offset:offset + len(request)], dtype=np.float64).tolist())
+                offset += len(request)
+
+    async def predict(self, configurations):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((configurations, future))
+        return await future
+
+    # ---- HTTP ----------------------------------------------------------------------------
+
+    @staticmethod
+    def parse_configurations(body, columns):
+        """
+        Returns (configurations, batched) from a /predict request body. Every configuration is
+        validated against the model's feature columns before it is queued, so a malformed one
+        fails only its own request instead of the whole batch window it would be priced in.
+        """
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise RequestError(400, "Request body is not valid JSON")
+
+        if isinstance(payload, dict) and "configurations" in payload:
+            configurations, batched = payload["configurations"], True
+        elif isinstance(payload, dict) and "configuration" in payload:
+            configurations, batched = [payload["configuration"]], False
+        elif isinstance(payload, dict):
+            configurations, batched = [payload], False
+        else:
+            configurations, batched = payload, True
+
+        if not isinstance(configurations, list) or not configurations:
+            raise RequestError(400, "Expected a configuration or a non-empty list of configurations")
+        for i, config in enumerate(configurations):
+            if isinstance(config, dict):
+                if set(config) != set(columns):
+                    raise RequestError(400, f"Configuration {i} must have exactly the features {', '.join(columns)}")
+                values = config.values()
+            elif isinstance(config, list):
+                if len(config) != len(columns):
+                    raise RequestError(400, f"Configuration {i} must list {len(columns)} values ({', '.join(columns)})")
+                values = config
+            else:
+                raise RequestError(400, "Every configuration must be an object or a list of feature values")
+            if not all(isinstance(value, str) for value in values):
+                raise RequestError(400, f"Configuration {i} must have string values")
+        return configurations, batched
+
+    @staticmethod
+    def parse_similar(body):
+        """
+        Returns (configuration, k) from a /similar request body.
+        """
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise RequestError(400, "Request body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise RequestError(400, "Expected a configuration object")
+        configuration = payload.get("configuration", payload)
+        k = payload.get("k", 5) if "configuration" in payload else 5
+        # bool is a subclass of int, but JSON true/false is not a count
+        if (not isinstance(configuration, dict) or isinstance(k, bool) or not isinstance(k, int)
+                or not 1 <= k <= MAX_SIMILAR_LISTINGS):
+            raise RequestError(400, f"Expected {{\"configuration\": {{...}}, \"k\": 1..{MAX_SIMILAR_LISTINGS}}}")
+        return configuration, k
+
+    async def handle_request(self, method, path, body):
+        """
+        Routes one request and returns (status, payload).
+        """
+        path = path.split("?", 1)[0]
+        if path == "/predict":
+            if method != "POST":
+                raise RequestError(405, "Use POST /predict")
+            if self.model is None:
+                raise RequestError(503, "No trained model available")
+            start = time.perf_counter()
+            configurations, batched = self.parse_configurations(body, self.model.feature_columns)
+            prices = await self.predict(configurations)
+            self.metrics.record(time.perf_counter() - start, len(configurations))
+            return 200, {"prices": prices} if batched else {"price": prices[0]}
+        if path == "/similar":
+            if method != "POST":
+                raise RequestError(405, "Use POST /similar")
+            model = self.model
+            if model is None or not model.has_listing_index():
+                raise RequestError(503, "No model with a listing index available")
+            configuration, k = self.parse_similar(body)
+            if model.listing_index is None or model.listing_index.group_codes is None:
+                await asyncio.get_running_loop().run_in_executor(None, self.prepare_listing_index, model)
+                if model.listing_index is None:
+                    raise RequestError(503, "No model with a listing index available")
+            # Sub-millisecond index lookup: answered inline instead of going through the batch queue
+            return 200, {"listings": model.similar_listings(configuration, k)}
+        if path == "/metrics" and method == "GET":
+            return 200, self.metrics.snapshot()
+        if path == "/health" and method == "GET":
+            return 200, {"model_loaded": self.model is not None, "model_path": self.model_path}
+        raise RequestError(404, f"Unknown endpoint {method} {path}")
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves HTTP/1.1 requests on one connection until the client closes it (keep-alive).
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, version = (request_line.split(" ") + ["", ""])[:3]
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = headers.get("content-length", "0")
+                    if not length.isdigit():
+                        raise RequestError(400, "Invalid Content-Length")
+                    if int(length) > MAX_BODY_BYTES:
+                        raise RequestError(413, "Request body too large")
+                    body = await reader.readexactly(int(length)) if int(length) else b""
+                    status, payload = await self.handle_request(method, path, body)
+                except RequestError as e:
+                    self.metrics.errors += 1
+                    status, payload = e.status, {"error": str(e)}
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                content = json.dumps(payload).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(content)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                             + content)
+                await writer.drain()
+                # The body of a rejected oversized or unparsable request was not read: drop the connection
+                if not keep_alive or status == 413 or not length.isdigit():
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        """
+        Loads the model and starts listening, the batch worker and the artifact watcher.
+        """
+        self.queue = asyncio.Queue()
+        await self.reload_model()
+        if self.model is None:
+            print("⚠️ No trained model yet – /predict answers 503 until the artifact appears.")
+        self.tasks = [asyncio.create_task(self.batch_worker()), asyncio.create_task(self.watch_model())]
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # The actual port when 0 was requested
+        print(f"✅ Prediction server listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            for task in self.tasks:
+                task.cancel()
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """
+    Runs the prediction server until interrupted.
+    """
+    try:
+        asyncio.run(PredictionServer(host, port, **options).serve_forever())
+    except KeyboardInterrupt:
+        print("👋 Prediction server stopped.")
@@ -0,0 +1,146 @@
+import numpy as np
+
+
+class PriceCube:
+    """
+    Every configuration selectable in the GUI, priced once into a dense NumPy array
+    indexed by option codes (one axis per feature), plus a price-sorted index.
+
+    Point lookups are a single array access; budget and constraint queries are a binary
+    search on the sorted prices followed by vectorized filtering on the option codes.
+    """
+
+    def __init__(self, options, contributions, intercept):
+        """
+        :param options: Dict of feature -> list of selectable options (axis order = dict order).
+        :param contributions: Dict of feature -> array of price contributions, one per option.
+        :param intercept: Base price added to every configuration.
+        """
+        self.columns = list(options)
+        self.options = {column: list(values) for column, values in options.items()}
+        self.codes = {column: {option: code for code, option in enumerate(values)}
+                      for column, values in self.options.items()}
+
+        # Sum the per-feature contributions over all combinations by broadcasting
+        prices = np.full([len(values) for values in self.options.values()], intercept, dtype=np.float64)
+        for axis, column in enumerate(self.columns):
+            shape = [1] * len(self.columns)
+            shape[axis] = -1
+            prices += np.asarray(contributions[column], dtype=np.float64).reshape(shape)
+        self.prices = np.maximum(prices, 0)  # Same non-negative clamp as PredictionModel.predict
+
+        flat = self.prices.ravel()
+        self.order = np.argsort(flat, kind="stable")  # Flat indexes sorted by price
+        self.sorted_prices = flat[self.order]
+
+    @property
+    def size(self):
+        return self.prices.size
+
+    def index(self, configuration):
+        """
+        Returns the array index of a configuration (dict of feature -> option).
+        """
+        try:
+            return tuple(self.codes[column][configuration[column]] for column in self.columns)
+        except KeyError as e:
+            raise ValueError(f"❌ Error: Unknown option {e} – choose one of the GUI options!")
+
+    def configuration(self, flat_index):
+        """
+        Returns the configuration dict stored at a flat index.
+        """
+        coordinates = np.unravel_index(flat_index, self.prices.shape)
+        return {column: self.options[column][code] for column, code in zip(self.columns, coordinates)}
+
+    def price(self, configuration):
+        """
+        O(1) price lookup for a configuration.
+        """
+        return float(self.prices[self.index(configuration)])
+
+    def at_least(self, column, option):
+        """
+        Returns the options of a feature from the given one onwards, for features whose
+        options are listed in increasing order (e.g. RAM: at_least("ram", "32GB")).
+        """
+        values = self.options[column]
+        if option not in values:
+            raise ValueError(f"❌ Error: Unknown option '{option}' – choose one of {', '.join(values)}!")
+        return values[values.index(option):]
+
+    def allowed_codes(self, column, allowed):
+        """
+        Converts a constraint (iterable of options or a predicate on an option) to option codes.
+        """
+        values = self.options[column]
+        if callable(allowed):
+            return [code for code, option in enumerate(values) if allowed(option)]
+        allowed = set(allowed)
+        return [code for code, option in enumerate(values) if option in allowed]
+
+    def query(self, max_price=None, min_price=None, constraints=None, limit=None, descending=False):
+        """
+        Returns configurations priced within [min_price, max_price] that satisfy the constraints
+        (dict of feature -> allowed options or predicate), sorted by price.
+        Each result is the configuration dict with an added "price" key.
+        """
+        low = 0 if min_price is None else np.searchsorted(self.sorted_prices, min_price, side="left")
+        high = self.size if max_price is None else np.searchsorted(self.sorted_prices, max_price, side="right")
+        candidates = self.order[low:high]
+
+        if constraints:
+            coordinates = np.unravel_index(candidates, self.prices.shape)
+            mask = np.ones(len(candidates), dtype=bool)
+            for column, allowed in constraints.items():
+                axis = self.columns.index(column)
+                mask &= np.isin(coordinates[axis], self.allowed_codes(column, allowed))
+            candidates = candidates[mask]
+
+        if descending:
+            candidates = candidates[::-1]
+        if limit is not None:
+            candidates = candidates[:limit]
+        return [dict(self.configuration(flat_index), price=float(self.prices.flat[flat_index]))
+                for flat_index in candidates]
+
+    def cheapest_upgrade(self, configuration, constraints):
+        """
+        Finds the cheapest way to make a configuration satisfy the constraints while keeping
+        every unconstrained component. Returns None if no configuration satisfies them, otherwise
+        a dict with the target configuration, its price, the price difference and the upgrade
+        path: single-component changes ordered cheapest first, with the price after each step.
+        """
+        current = self.index(configuration)
+        axes = []
+        for axis, column in enumerate(self.columns):
+            if column in constraints:
+                axes.append(self.allowed_codes(column, constraints[column]))
+            else:
+                axes.append([current[axis]])
+        if any(not codes for codes in axes):
+            return None
+
+        candidates = self.prices[np.ix_(*axes)]
+        best = np.unravel_index(np.argmin(candidates), candidates.shape)
+        target = tuple(codes[i] for codes, i in zip(axes, best))
+
+        # Apply the changed components one at a time, cheapest step first
+        steps, position = [], list(current)
+        changes = [axis for axis in range(len(self.columns)) if target[axis] != current[axis]]
+        while changes:
+            def price_with(axis):
+                trial = list(position)
+                trial[axis] = target[axis]
+                return self.prices[tuple(trial)]
+            axis = min(changes, key=price_with)
+            changes.remove(axis)
+            column = self.columns[axis]
+            steps.append({"feature": column, "from": self.options[column][position[axis]],
+                          "to": self.options[column][target[axis]], "price": float(price_with(axis))})
+            position[axis] = target[axis]
+
+        current_price = float(self.prices[current])
+        target_price = float(self.prices[target])
+        return {"configuration": {column: self.options[column][code] for column, code in zip(self.columns, target)},
+                "price": target_price, "delta": target_price - current_price, "steps": steps}
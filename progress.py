@@ -0,0 +1,54 @@
+import queue
+import threading
+
+
+class TrainingCancelled(Exception):
+    """
+    Raised inside a worker when the user cancelled the running job.
+    """
+
+
+class ProgressChannel:
+    """
+    A thread-safe channel between a background job and the GUI.
+    The worker reports progress messages through a queue and checks a cancellation
+    event between steps; the GUI drains the queue from the Tk event loop.
+    """
+
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+
+    def report(self, stage, done=None, total=None, rows=None):
+        """
+        Reports progress of a stage (e.g. "fetch", "parse", "fit"), optionally with
+        the number of steps done out of total and the number of rows so far.
+        """
+        self.messages.put({"stage": stage, "done": done, "total": total, "rows": rows})
+
+    def cancel(self):
+        """
+        Requests cancellation; the worker stops at its next check.
+        """
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """
+        Raises TrainingCancelled if cancellation was requested.
+        """
+        if self.cancel_event.is_set():
+            raise TrainingCancelled()
+
+    def drain(self):
+        """
+        Returns all messages reported since the last call, without blocking.
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
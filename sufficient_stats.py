@@ -0,0 +1,132 @@
+import numpy as np
+
+
+class SufficientStatistics:
+    """
+    Normal-equation sufficient statistics of a linear regression over one-hot encoded features.
+
+    With Z = [1, one-hot(x)] for every row, it keeps ZᵀZ and Zᵀy; the first row and column hold
+    the number of rows, the per-category counts and the sum of prices. Folding in new rows costs
+    O(rows) and solving costs O(p³) in the number of categories, independent of the history size.
+    New categories extend the one-hot space by appending a zero row and column.
+    A positive alpha solves the Ridge problem instead, matching the model selected at training.
+    """
+
+    def __init__(self, feature_columns, alpha=0.0):
+        self.feature_columns = list(feature_columns)
+        self.alpha = float(alpha)  # Ridge penalty on the coefficients (0 for ordinary least squares)
+        self.vocabularies = {column: [] for column in self.feature_columns}  # Categories in position order
+        self.positions = {column: {} for column in self.feature_columns}  # Category -> position in Z
+        self.ztz = np.zeros((1, 1))
+        self.zty = np.zeros(1)
+
+    @property
+    def rows(self):
+        return int(round(self.ztz[0, 0]))
+
+    @property
+    def size(self):
+        return self.ztz.shape[0]
+
+    def copy(self):
+        """
+        Returns an independent copy (updates to it do not affect this one).
+        """
+        clone = SufficientStatistics(self.feature_columns, self.alpha)
+        clone.vocabularies = {column: list(values) for column, values in self.vocabularies.items()}
+        clone.positions = {column: dict(values) for column, values in self.positions.items()}
+        clone.ztz = self.ztz.copy()
+        clone.zty = self.zty.copy()
+        return clone
+
+    def extend(self, column, categories):
+        """
+        Adds unseen categories of a column to the one-hot space.
+        """
+        new = [category for category in dict.fromkeys(categories) if category not in self.positions[column]]
+        if not new:
+            return
+        start = self.size
+        for offset, category in enumerate(new):
+            self.positions[column][category] = start + offset
+            self.vocabularies[column].append(category)
+        self.ztz = np.pad(self.ztz, ((0, len(new)), (0, len(new))))
+        self.zty = np.pad(self.zty, (0, len(new)))
+
+    def update(self, features, target):
+        """
+        Folds categorized feature rows (a DataFrame) and their prices into the statistics.
+        Rows without a price are skipped.
+        """
+        import pandas as pd
+
+        target = np.asarray(target, dtype=np.float64)
+        valid = ~np.isnan(target)
+        features, target = features[valid], target[valid]
+        if len(target) == 0:
+            return
+
+        # Position of every row's category in Z, one array per feature (the intercept is position 0)
+        row_positions = [np.zeros(len(target), dtype=np.int64)]
+        for column in self.feature_columns:
+            codes, uniques = pd.factorize(features[column])
+            categories = [category if isinstance(category, str) else "Other" for category in uniques]
+            if (codes < 0).any():
+                categories.append("Other")  # Missing values have code -1, like categorize_feature
+            self.extend(column, categories)
+            lookup = np.array([self.positions[column][category] for category in categories], dtype=np.int64)
+            row_positions.append(lookup[codes])
+
+        size = self.size
+        for i, left in enumerate(row_positions):
+            self.zty += np.bincount(left, weights=target, minlength=size)
+            for right in row_positions[i:]:
+                counts = np.bincount(left * size + right, minlength=size * size).reshape(size, size)
+                self.ztz += counts if right is left else counts + counts.T
+
+    def solve(self):
+        """
+        Solves the centered normal equations (the same solution as LinearRegression, or Ridge
+        for a positive alpha, on the one-hot features). Returns (lookup_tables, intercept).
+        """
+        n = self.ztz[0, 0]
+        mean = self.ztz[0, 1:] / n
+        mean_y = self.zty[0] / n
+        covariance = self.ztz[1:, 1:] - n * np.outer(mean, mean)
+        cross = self.zty[1:] - n * mean * mean_y
+        covariance[np.diag_indices_from(covariance)] += self.alpha
+        coefficients = np.linalg.lstsq(covariance, cross, rcond=None)[0]
+        intercept = float(mean_y - mean @ coefficients)
+
+        lookup_tables = {column: {category: float(coefficients[position - 1])
+                                  for category, position in self.positions[column].items()}
+                         for column in self.feature_columns}
+        return lookup_tables, intercept
+
+    def to_arrays(self):
+        """
+        Returns the statistics as plain arrays for the model artifact.
+        """
+        arrays = {"stats_ztz": self.ztz, "stats_zty": self.zty, "stats_alpha": np.array([self.alpha])}
+        for i, column in enumerate(self.feature_columns):
+            arrays[f"stats_vocab_{i}"] = np.array(self.vocabularies[column], dtype=str)
+            arrays[f"stats_pos_{i}"] = np.array([self.positions[column][category]
+                                                 for category in self.vocabularies[column]], dtype=np.int64)
+        return arrays
+
+    @staticmethod
+    def from_arrays(feature_columns, arrays):
+        """
+        Rebuilds statistics saved with to_arrays, or returns None if the arrays are missing.
+        """
+        if "stats_ztz" not in arrays:
+            return None
+        alpha = float(arrays["stats_alpha"][0]) if "stats_alpha" in arrays else 0.0
+        statistics = SufficientStatistics(feature_columns, alpha)
+        for i, column in enumerate(statistics.feature_columns):
+            categories = arrays[f"stats_vocab_{i}"].tolist()
+            statistics.vocabularies[column] = categories
+            statistics.positions[column] = dict(zip(categories, arrays[f"stats_pos_{i}"].tolist()))
+        statistics.ztz = np.array(arrays["stats_ztz"], dtype=np.float64)
+        statistics.zty = np.array(arrays["stats_zty"], dtype=np.float64)
+        return statistics
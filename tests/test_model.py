@@ -0,0 +1,45 @@
+import os
+import pickle
+
+import numpy as np
+
+from benchmarks.synthetic import generate_listings_frame
+from model import LEGACY_MODEL_FILENAME, MODEL_FILENAME, PredictionModel
+
+
+def test_migrates_pickle_without_newer_attributes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    trained = PredictionModel(generate_listings_frame(2_000), load_existing=False)
+    configuration = generate_listings_frame(1, seed=1).iloc[0, :-1].to_dict()
+    expected = trained.predict(configuration)
+
+    # Older versions pickled the whole object, without the attributes added since
+    os.remove(MODEL_FILENAME)
+    for attribute in ("feature_columns", "lookup_tables", "intercept", "price_cube", "statistics",
+                      "estimator_name", "dataset_key", "listing_index"):
+        delattr(trained, attribute)
+    with open(LEGACY_MODEL_FILENAME, "wb") as file:
+        pickle.dump(trained, file)
+
+    migrated = PredictionModel()
+    assert os.path.exists(MODEL_FILENAME)
+    np.testing.assert_allclose(migrated.predict(configuration), expected)
+    np.testing.assert_allclose(PredictionModel().predict(configuration), expected)
+
+
+def test_reports_failed_migration(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    trained = PredictionModel(generate_listings_frame(2_000), load_existing=False)
+    os.remove(MODEL_FILENAME)
+    with open(LEGACY_MODEL_FILENAME, "wb") as file:
+        pickle.dump(trained, file)
+
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr("model.write_artifact", fail)
+    capsys.readouterr()
+
+    assert PredictionModel().is_trained()
+    output = capsys.readouterr().out
+    assert not os.path.exists(MODEL_FILENAME)
+    assert "Migrated" not in output and "Could not migrate" in output
@@ -1,6 +1,15 @@
 import ttkbootstrap as tb
-import pandas as pd
 from tkinter import messagebox
+from model import PredictionModel
+
+INPUT_OPTIONS = PredictionModel.INPUT_OPTIONS  # Options offered for every feature
+
+# Status texts for the training stages reported through the progress channel
+STAGE_LABELS = {
+    "fetch": "Fetching pages", "store": "Storing listings", "categorize": "Categorizing features",
+    "encode": "Encoding features", "select": "Cross-validating models", "fit": "Fitting model",
+    "evaluate": "Evaluating model", "refit": "Refitting on all listings", "save": "Saving model",
+}
 
 
 class Root(tb.Window):
@@ -14,15 +23,20 @@ class Root(tb.Window):
 
 
 class UserInterface(Root):
-    def __init__(self, model, train_callback):
+    COMPARABLE_LISTINGS = 5  # Actual listings shown next to an estimate
+
+    def __init__(self, model, train_callback, cancel_callback=None, rollback_callback=None):
         """
         Creates the graphical interface for user interaction.
 
         :param model: The machine learning model used for price prediction.
-        :param train_callback: Function to retrain the model.
+        :param train_callback: Function that starts retraining the model in the background.
+        :param cancel_callback: Function that cancels a running training job.
+        :param rollback_callback: Function that re-activates the previous model.
         """
         super().__init__()
         self.button_confirm = None
+        self.button_explore = None
         self.combobox_condition = None
         self.combobox_os = None
         self.combobox_storage = None
@@ -30,8 +44,13 @@ class UserInterface(Root):
         self.combobox_graphic_card = None
         self.combobox_processor = None
         self.button_train = None
+        self.button_cancel = None
+        self.button_rollback = None
+        self.progress_bar = None
         self.model = model  # Store the predictive model
         self.train_callback = train_callback  # Function for training the model
+        self.cancel_callback = cancel_callback  # Function for cancelling training
+        self.rollback_callback = rollback_callback  # Function for rolling back to the previous model
 
         # Welcome Label
         self.label_welcome = tb.Label(self, text="Welcome to Computer Price Prediction",
@@ -44,36 +63,37 @@ class UserInterface(Root):
         # Buttons for confirming price prediction and training the model
         self.create_buttons()
 
+        # Status line (model loading state)
+        self.label_status = tb.Label(self, text="", bootstyle="secondary")
+        self.label_status.place(relx=0.5, rely=0.97, anchor="center")
+
     def create_comboboxes(self):
         """
         Creates dropdown selection boxes for various computer specifications.
         """
         # Processor
         self.create_label("Processor:", 0.15)
-        self.combobox_processor = self.create_combobox(["Intel i3", "Intel i5", "Intel i7", "Intel i9", "Intel Xeon",
-                                                        "AMD Ryzen 3", "AMD Ryzen 5", "AMD Ryzen 7", "AMD Ryzen 9"],
-                                                       0.15)
+        self.combobox_processor = self.create_combobox(INPUT_OPTIONS["processor"], 0.15)
 
         # Graphics Card
         self.create_label("Graphics Card:", 0.25)
-        self.combobox_graphic_card = self.create_combobox(["NVIDIA GTX", "NVIDIA RTX", "AMD Radeon",
-                                                           "NVIDIA Quadro", "Intel Integrated"], 0.25)
+        self.combobox_graphic_card = self.create_combobox(INPUT_OPTIONS["graphic_card"], 0.25)
 
         # RAM
         self.create_label("RAM:", 0.35)
-        self.combobox_ram = self.create_combobox(["8GB", "16GB", "32GB", "64GB"], 0.35)
+        self.combobox_ram = self.create_combobox(INPUT_OPTIONS["ram"], 0.35)
 
         # Storage
         self.create_label("Storage:", 0.45)
-        self.combobox_storage = self.create_combobox(["HDD", "SSD", "NVMe"], 0.45)
+        self.combobox_storage = self.create_combobox(INPUT_OPTIONS["disk"], 0.45)
 
         # Operating System
         self.create_label("Operating System:", 0.55)
-        self.combobox_os = self.create_combobox(["Windows", "Linux", "No OS"], 0.55)
+        self.combobox_os = self.create_combobox(INPUT_OPTIONS["os"], 0.55)
 
         # Condition
         self.create_label("Condition:", 0.65)
-        self.combobox_condition = self.create_combobox(["New", "Very Good", "Used", "Damaged"], 0.65)
+        self.combobox_condition = self.create_combobox(INPUT_OPTIONS["condition"], 0.65)
 
     def create_label(self, text, rel_y):
         """
@@ -96,15 +116,32 @@ class UserInterface(Root):
         """
         # Confirm button for price prediction
         self.button_confirm = tb.Button(self, text="Confirm", command=self.confirm, bootstyle="secondary")
-        self.button_confirm.place(relx=0.5, rely=0.8, anchor="center")
+        self.button_confirm.place(relx=0.4, rely=0.8, anchor="center")
+
+        # Explore button for budget/constraint queries over all configurations
+        self.button_explore = tb.Button(self, text="Explore", command=self.explore, bootstyle="secondary")
+        self.button_explore.place(relx=0.6, rely=0.8, anchor="center")
 
-        # Disable confirm button if no model is loaded
+        # Disable confirm and explore buttons if no model is loaded
         if self.model is None:
             self.button_confirm["state"] = "disabled"
+            self.button_explore["state"] = "disabled"
 
-        # Train Model button
+        # Train Model and Cancel buttons
         self.button_train = tb.Button(self, text="Train Model", command=self.train_model, bootstyle="primary")
-        self.button_train.place(relx=0.5, rely=0.9, anchor="center")
+        self.button_train.place(relx=0.3, rely=0.9, anchor="center")
+        self.button_cancel = tb.Button(self, text="Cancel", command=self.cancel_training, bootstyle="danger",
+                                       state="disabled")
+        self.button_cancel.place(relx=0.5, rely=0.9, anchor="center")
+
+        # Rollback button re-activates the previous model from the registry
+        self.button_rollback = tb.Button(self, text="Rollback", command=self.rollback_model, bootstyle="warning",
+                                         state="normal" if self.rollback_callback is not None else "disabled")
+        self.button_rollback.place(relx=0.7, rely=0.9, anchor="center")
+
+        # Training progress
+        self.progress_bar = tb.Progressbar(self, length=300, mode="determinate", bootstyle="info")
+        self.progress_bar.place(relx=0.5, rely=0.72, anchor="center")
 
     def confirm(self):
         """
@@ -112,11 +149,11 @@ class UserInterface(Root):
         """
         self.predict_price()
 
-    def predict_price(self):
+    def get_selection(self):
         """
-        Predicts the price of a computer based on user input.
+        Returns the current combobox selections keyed by feature name.
         """
-        input_data = {
+        return {
             "processor": self.combobox_processor.get(),
             "graphic_card": self.combobox_graphic_card.get(),
             "ram": self.combobox_ram.get(),
@@ -125,45 +162,231 @@ class UserInterface(Root):
             "condition": self.combobox_condition.get()
         }
 
+    def explore(self):
+        """
+        Opens the panel for querying all configurations by budget and constraints.
+        """
+        ExplorePanel(self)
+
+    def predict_price(self):
+        """
+        Predicts the price of a computer based on user input.
+        """
+        input_data = self.get_selection()
+
         # Check if all fields are filled
         if "" in input_data.values():
             messagebox.showwarning("Missing Data", "Please fill in all fields before proceeding.")
             return
 
-        input_df = pd.DataFrame([input_data])
-
         # Ensure the model is loaded and ready
-        if self.model is None or self.model.features is None or self.model.features.empty:
+        if self.model is None or not self.model.is_trained():
             messagebox.showerror("Error", "The model is not properly loaded! Please train it first.")
             return
 
         # Ensure the input columns match the model’s expected features
-        missing_cols = set(self.model.features.columns) - set(input_df.columns)
+        missing_cols = set(self.model.feature_columns) - set(input_data)
         if missing_cols:
             messagebox.showerror("Error", f"Missing columns: {missing_cols}")
             return
 
-        # Align input data with model features
-        input_df = input_df[self.model.features.columns]
-
         try:
-            predicted_price = self.model.predict(input_df)[0]
-            messagebox.showinfo("Predicted Price", f"Estimated price: {predicted_price:.2f} zł")
+            predicted_price = self.model.predict(input_data)[0]  # Single configuration, scored via lookup tables
+            message = f"Estimated price: {predicted_price:.2f} zł"
+            if self.model.has_listing_index():
+                # The closest actual listings, so the estimate can be checked against real prices
+                columns = self.model.feature_columns
+                message += "\n\nComparable listings:"
+                for listing in self.model.similar_listings(input_data, self.COMPARABLE_LISTINGS):
+                    message += (f"\n{listing['price']:.2f} zł – " + ", ".join(listing[column] for column in columns)
+                                + f" ({listing['matches']}/{len(columns)} match)")
+            messagebox.showinfo("Predicted Price", message)
         except Exception as e:
             messagebox.showerror("Error", f"Prediction failed: {str(e)}")
 
+    def set_status(self, text):
+        """
+        Shows a short status message at the bottom of the window.
+        """
+        self.label_status["text"] = text
+
     def update_model(self, new_model):
         """
         Updates the model in the UI after retraining.
         """
         self.model = new_model
-        self.button_confirm["state"] = "normal"  # Enable the confirm button
+        self.button_confirm["state"] = "normal"  # Enable the confirm and explore buttons
+        self.button_explore["state"] = "normal"
         print("✅ Model updated in GUI!")
 
     def train_model(self):
         """
-        Trains the model and updates the UI.
+        Starts training the model in the background.
         """
         self.train_callback()
-        self.button_confirm["state"] = "normal"
-        messagebox.showinfo("Success", "The model has been retrained and saved!")
+
+    def cancel_training(self):
+        """
+        Cancels the running training job.
+        """
+        if self.cancel_callback is not None:
+            self.cancel_callback()
+
+    def rollback_model(self):
+        """
+        Switches back to the previously active model.
+        """
+        if self.rollback_callback is not None:
+            self.rollback_callback()
+
+    def training_started(self):
+        """
+        Switches the UI into training mode.
+        """
+        self.button_train["state"] = "disabled"
+        self.button_cancel["state"] = "normal"
+        self.button_rollback["state"] = "disabled"
+        self.progress_bar.configure(mode="determinate", value=0)
+        self.set_status("Starting training...")
+
+    def show_progress(self, message):
+        """
+        Shows a progress message from the training job: page progress as a determinate bar,
+        the other stages as an indeterminate one.
+        """
+        text = STAGE_LABELS.get(message["stage"], message["stage"])
+        if message["total"]:
+            if str(self.progress_bar["mode"]) != "determinate":
+                self.progress_bar.stop()
+                self.progress_bar.configure(mode="determinate")
+            self.progress_bar["value"] = 100 * message["done"] / message["total"]
+            text += f" {message['done']}/{message['total']}"
+        elif str(self.progress_bar["mode"]) != "indeterminate":
+            self.progress_bar.configure(mode="indeterminate")
+            self.progress_bar.start(15)
+        if message["rows"] is not None:
+            text += f" · {message['rows']} rows"
+        self.set_status(text)
+
+    def training_finished(self, status):
+        """
+        Leaves training mode and shows the final status.
+        """
+        self.progress_bar.stop()
+        self.progress_bar.configure(mode="determinate", value=100 if status == "Model ready" else 0)
+        self.button_train["state"] = "normal"
+        self.button_cancel["state"] = "disabled"
+        if self.rollback_callback is not None:
+            self.button_rollback["state"] = "normal"
+        self.set_status(status)
+
+
+class ExplorePanel(tb.Toplevel):
+    """
+    A window listing configurations under a budget with a minimum amount of RAM,
+    and the cheapest upgrade of the current selection to reach that RAM.
+    """
+
+    RESULT_LIMIT = 200  # Maximum number of rows shown
+    COLUMNS = ("processor", "graphic_card", "ram", "disk", "os", "condition", "price")
+
+    def __init__(self, parent):
+        super().__init__(title="Explore Configurations")
+        self.geometry('820x480')
+        self.parent = parent
+
+        controls = tb.Frame(self, padding=10)
+        controls.pack(fill="x")
+        tb.Label(controls, text="Max price (zł):").pack(side="left")
+        self.entry_max_price = tb.Entry(controls, width=10)
+        self.entry_max_price.pack(side="left", padx=(5, 15))
+        tb.Label(controls, text="Min RAM:").pack(side="left")
+        # Read-only: the constraint must be one of the options of the price cube
+        self.combobox_min_ram = tb.Combobox(controls, values=[""] + INPUT_OPTIONS["ram"], width=8, state="readonly")
+        self.combobox_min_ram.pack(side="left", padx=(5, 15))
+        tb.Button(controls, text="Search", command=self.search, bootstyle="primary").pack(side="left", padx=5)
+        tb.Button(controls, text="Cheapest upgrade", command=self.upgrade, bootstyle="secondary").pack(side="left")
+
+        self.tree = tb.Treeview(self, columns=self.COLUMNS, show="headings")
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column.replace("_", " ").title())
+            self.tree.column(column, width=100, anchor="center")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def model_ready(self):
+        """
+        Checks that a model with a price cube is loaded.
+        """
+        model = self.parent.model
+        if model is None or model.price_cube is None:
+            messagebox.showerror("Error", "The model is not properly loaded! Please train it first.", parent=self)
+            return False
+        return True
+
+    def read_constraints(self):
+        """
+        Reads the budget and RAM constraint from the controls.
+        Returns (max_price, constraints) or None if the budget is not a number.
+        """
+        text = self.entry_max_price.get().strip().replace(",", ".")
+        try:
+            max_price = float(text) if text else None
+        except ValueError:
+            messagebox.showwarning("Invalid Budget", "Please enter the maximum price as a number.", parent=self)
+            return None
+        min_ram = self.combobox_min_ram.get()
+        constraints = {"ram": self.parent.model.price_cube.at_least("ram", min_ram)} if min_ram else {}
+        return max_price, constraints
+
+    def show_rows(self, rows):
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", "end", values=[row[column] if column != "price" else f"{row['price']:.2f}"
+                                                for column in self.COLUMNS])
+
+    def search(self):
+        """
+        Lists the configurations within the budget, cheapest first.
+        """
+        if not self.model_ready():
+            return
+        query = self.read_constraints()
+        if query is None:
+            return
+        max_price, constraints = query
+        self.show_rows(self.parent.model.query_configurations(max_price=max_price, constraints=constraints,
+                                                              limit=self.RESULT_LIMIT))
+
+    def upgrade(self):
+        """
+        Shows the cheapest upgrade path from the main window's selection to the minimum RAM.
+        """
+        if not self.model_ready():
+            return
+        selection = self.parent.get_selection()
+        if "" in selection.values():
+            messagebox.showwarning("Missing Data", "Please fill in all fields in the main window first.", parent=self)
+            return
+        query = self.read_constraints()
+        if query is None:
+            return
+        if not query[1]:
+            messagebox.showwarning("Missing Data", "Please choose the minimum RAM to upgrade to.", parent=self)
+            return
+
+        # The main window's comboboxes accept typed text, but the price cube only knows the listed options
+        try:
+            result = self.parent.model.cheapest_upgrade(selection, query[1])
+            rows = [dict(selection, price=self.parent.model.price_cube.price(selection))]
+        except ValueError:
+            messagebox.showwarning("Invalid Selection", "Please choose the main window's options from the lists "
+                                                        "to search for upgrades.", parent=self)
+            return
+        if result is None:
+            messagebox.showinfo("Cheapest Upgrade", "No configuration satisfies the constraints.", parent=self)
+            return
+        for step in result["steps"]:
+            rows.append(dict(rows[-1], **{step["feature"]: step["to"]}, price=step["price"]))
+        self.show_rows(rows)
+        messagebox.showinfo("Cheapest Upgrade", f"Upgrade cost: {result['delta']:+.2f} zł "
+                                                f"(new price {result['price']:.2f} zł)", parent=self)